@@ -81,6 +81,16 @@ DATABASES = {
 #     }
 # }
 
+# Cache - shared by all worker processes on the server (data version
+# stamps, in-memory index invalidation). File based so no extra service
+# is needed on the warehouse PC.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    }
+}
+
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
 
@@ -132,6 +142,47 @@ PG_DUMP_PATH = r"D:\Postgres\bin\pg_dump.exe"
 # Pagination
 DEFAULT_PAGE_SIZE = 50
 
+# Abandoned PENDING/CANCELLED movements older than this are purged
+# by `python manage.py purge_movements`
+MOVEMENT_RETENTION_DAYS = 30
+
+# Catalog changes (scanner station sync) older than this are compacted to
+# the newest change per product by `python manage.py compact_catalog_changes`
+CATALOG_CHANGE_RETENTION_DAYS = 30
+
+# Months of movements kept in the live tables; older closed months are
+# moved to backups/archive by `python manage.py archive_movements`
+MOVEMENT_HOT_MONTHS = 12
+
+# Dashboard counters are cached per data version; this timeout (seconds)
+# is only a safety net for changes made outside the app
+DASHBOARD_CACHE_TIMEOUT = 300
+
+# Background reports (`python manage.py run_report_worker`): finished files
+# in media/reports are kept this long (seconds); a job running, or still
+# waiting for a worker, longer than REPORT_JOB_TIMEOUT is marked failed
+REPORT_JOB_TTL = 24 * 60 * 60
+REPORT_JOB_TIMEOUT = 30 * 60
+
+# Long PDF reports are rendered in chunks of this many table rows by a
+# process pool (PDF_WORKERS processes, None = one per CPU) and merged
+PDF_CHUNK_ROWS = 300
+PDF_WORKERS = None
+
+# Rendered reports are reused until stock/movement data changes; the
+# least recently used files are evicted past this size
+REPORT_CACHE_DIR = BASE_DIR / 'cache' / 'reports'
+REPORT_CACHE_MAX_BYTES = 500 * 1024 * 1024
+
+# Low-stock forecast: daily OUT quantities of the last FORECAST_WINDOW_DAYS
+# days are smoothed exponentially (span in days); a product is due for
+# reorder when its stock no longer covers REORDER_LEAD_DAYS of demand plus
+# REORDER_SERVICE_Z standard deviations of safety stock
+FORECAST_WINDOW_DAYS = 90
+FORECAST_SPAN_DAYS = 30
+REORDER_LEAD_DAYS = 7
+REORDER_SERVICE_Z = 1.65
+
 CSRF_TRUSTED_ORIGINS = [
     "https://*.ngrok-free.app",
     "https://*.ngrok.io",
@@ -0,0 +1,88 @@
+"""
+Database aggregates and functions missing from django.db.models.
+"""
+from django.db import NotSupportedError
+from django.db.models import Aggregate, CharField, Func, IntegerField, Value
+from django.utils import timezone
+
+
+class GroupConcat(Aggregate):
+    """
+    Concatenate the non-NULL values of a group into one string.
+
+    string_agg() on PostgreSQL, group_concat() on SQLite and
+    GROUP_CONCAT(... SEPARATOR) on MySQL. Order within the group is not
+    guaranteed.
+    """
+    function = 'GROUP_CONCAT'
+    output_field = CharField()
+
+    def __init__(self, expression, separator=', ', **extra):
+        self.separator = separator
+        super().__init__(expression, **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        # MySQL / MariaDB syntax
+        return super().as_sql(
+            compiler, connection,
+            template="%(function)s(%(distinct)s%(expressions)s SEPARATOR '%(separator)s')",
+            separator=self.separator.replace("'", "''"),
+            **extra_context
+        )
+
+    def _with_separator(self):
+        clone = self.copy()
+        clone.source_expressions = [*clone.source_expressions, Value(self.separator)]
+        return clone
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super(GroupConcat, self._with_separator()).as_sql(
+            compiler, connection, function='GROUP_CONCAT', **extra_context
+        )
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return super(GroupConcat, self._with_separator()).as_sql(
+            compiler, connection, function='STRING_AGG', **extra_context
+        )
+
+
+class DayNumber(Func):
+    """
+    Days since 1970-01-01 of a date, so day offsets can be summed in SQL.
+
+    date - DATE on PostgreSQL, julianday() on SQLite and TO_DAYS() on MySQL.
+    """
+    output_field = IntegerField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, template='(TO_DAYS(%(expressions)s) - 719528)', **extra_context)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler, connection, template='CAST(julianday(%(expressions)s) - 2440587.5 AS INTEGER)', **extra_context
+        )
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, template="(%(expressions)s - DATE '1970-01-01')", **extra_context)
+
+
+class LocalDateTime(Func):
+    """
+    A datetime as local wall-clock text 'YYYY-MM-DD HH:MM:SS' in the
+    current time zone, for PostgreSQL COPY exports (CsvExport formats
+    datetimes the same way on other databases).
+
+    to_char(... AT TIME ZONE ...) on PostgreSQL only.
+    """
+    output_field = CharField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError("LocalDateTime is only supported on PostgreSQL")
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        sql, params = super().as_sql(
+            compiler, connection,
+            template="to_char(%(expressions)s AT TIME ZONE %%s, 'YYYY-MM-DD HH24:MI:SS')",
+            **extra_context
+        )
+        return sql, (*params, timezone.get_current_timezone_name())
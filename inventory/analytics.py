@@ -0,0 +1,341 @@
+"""
+Inventory analytics: turnover, days of cover, ABC classes and reorder
+forecasts.
+
+The period's daily IN/OUT rollups are summed by the database per product
+and type (quantity, value and day-weighted sums), so at most two rows per
+product reach Python however many days the period has. They are read
+straight into NumPy arrays and every metric is computed for the whole
+catalog at once.
+
+Stock levels are not stored per day. The average level over the period is
+derived from today's level: the level at the end of day d is current_qty
+minus the net movements after d, so its mean over D days is
+    current_qty - sum(net_k * k) / D      (k = day index of a movement)
+and sum(net_k * k) is one more SQL sum.
+
+The reorder forecast smooths daily OUT quantities exponentially. Days
+without consumption count as zeros, but they need no row either: the
+smoothed rate is sum(w_k * x_k) / sum(w) with w_k = (1 - alpha)^(D-1-k),
+and the sum of the weights only depends on D.
+
+Reversal documents are left out. A reversed movement is already dropped
+from the rollups, and its reversal is a correction, not consumption: the
+few (day, product, type) rollups a reversal touched are re-scored in
+Python without it.
+"""
+import math
+from datetime import date, timedelta
+import numpy as np
+from django.conf import settings
+from django.db.models import F, FloatField, Sum, Value
+from django.db.models.functions import Cast, Power
+from django.utils import timezone
+from .aggregates import DayNumber
+from .models import MovementDailyRollup, MovementItem, Product, Stock
+from .rollups import ITEM_VALUE, day_bounds
+
+# Cumulative share of consumption value closing the A and B classes
+ABC_THRESHOLDS = (0.80, 0.95)
+
+# Periods offered by the analytics report, in days
+ANALYTICS_PERIODS = (30, 90, 180, 365)
+DEFAULT_ANALYTICS_DAYS = 90
+
+EPOCH = date(1970, 1, 1)
+
+
+class AnalyticsService:
+    """Vectorised stock metrics over MovementDailyRollup."""
+
+    @staticmethod
+    def load(start_date, end_date, product_ids=None, span=None) -> dict:
+        """
+        Per-product sums of the period's rollups as arrays aligned with the
+        sorted `product_ids` (default all products): current_qty, in_qty,
+        out_qty, out_value and net_day_sum (sum of net quantity x day
+        index). With `span` (days), also the exponentially weighted OUT
+        sums out_weighted / out_weighted_square and their weight_sum.
+        """
+        if product_ids is None:
+            product_ids = Product.objects.order_by('id').values_list('id', flat=True)
+        product_ids = np.array(product_ids, dtype=np.int64)
+        n = len(product_ids)
+        days = (end_date - start_date).days + 1
+
+        stock = np.fromiter(
+            Stock.objects.values_list('product_id', 'current_qty').iterator(chunk_size=10000),
+            dtype=[('id', np.int64), ('qty', np.float64)],
+        )
+        idx, known = AnalyticsService._index(product_ids, stock['id'])
+        current_qty = np.zeros(n)
+        current_qty[idx[known]] = stock['qty'][known]
+
+        # Integer and decimal sums: no per-row casts
+        day_idx = DayNumber('date') - Value((start_date - EPOCH).days)
+        sums = {
+            'quantity_sum': Sum('quantity'),
+            'value_sum': Sum('value'),
+            'day_sum': Sum(F('quantity') * day_idx),
+        }
+        if span:
+            alpha = 2 / (span + 1)
+            # Newest day weighs 1, each older day (1 - alpha) times less.
+            # Float operands: numeric power() is far slower on PostgreSQL
+            weight = Power(Cast(Value(1 - alpha), FloatField()), Cast(Value(days - 1) - day_idx, FloatField()))
+            sums['weighted_sum'] = Sum(F('quantity') * weight, output_field=FloatField())
+            sums['weighted_square_sum'] = Sum(F('quantity') * F('quantity') * weight, output_field=FloatField())
+        rows = (
+            MovementDailyRollup.objects.filter(date__gte=start_date, date__lte=end_date)
+            .values('product_id', 'movement_type')
+            .annotate(**sums)
+            .order_by()
+            .values_list('product_id', 'movement_type', *sums)
+        )
+        dtype = [('id', np.int64), ('out', np.bool_)] + [(name, np.float64) for name in sums]
+        rows = np.fromiter(
+            (
+                (product_id, movement_type == 'OUT', *(float(value or 0) for value in values))
+                for product_id, movement_type, *values in rows.iterator(chunk_size=10000)
+            ),
+            dtype=dtype,
+        )
+
+        def terms(day, quantity, value):
+            # One day's contribution to each of the SQL sums above
+            result = {'quantity_sum': quantity, 'value_sum': value, 'day_sum': quantity * day}
+            if span:
+                weight = (1 - alpha) ** (days - 1 - day)
+                result['weighted_sum'] = quantity * weight
+                result['weighted_square_sum'] = quantity * quantity * weight
+            return result
+
+        corrections = [
+            (product_id, movement_type == 'OUT', *(
+                terms(day, quantity - reversed_qty, value - reversed_value)[name] - terms(day, quantity, value)[name]
+                for name in sums
+            ))
+            for product_id, movement_type, day, quantity, value, reversed_qty, reversed_value
+            in AnalyticsService._reversals(start_date, end_date)
+        ]
+        rows = np.concatenate([rows, np.array(corrections, dtype=dtype)])
+
+        # Products created since product_ids was read are left out
+        idx, known = AnalyticsService._index(product_ids, rows['id'])
+        is_in, is_out = known & ~rows['out'], known & rows['out']
+
+        def per_product(name, mask):
+            values = np.zeros(n)
+            np.add.at(values, idx[mask], rows[name][mask])
+            return values
+
+        data = {
+            'product_ids': product_ids,
+            'current_qty': current_qty,
+            'days': days,
+            'in_qty': per_product('quantity_sum', is_in),
+            'out_qty': per_product('quantity_sum', is_out),
+            'out_value': per_product('value_sum', is_out),
+            'net_day_sum': per_product('day_sum', is_in) - per_product('day_sum', is_out),
+        }
+        if span:
+            data['out_weighted'] = per_product('weighted_sum', is_out)
+            data['out_weighted_square'] = per_product('weighted_square_sum', is_out)
+            data['weight_sum'] = (1 - (1 - alpha) ** days) / alpha
+        return data
+
+    @staticmethod
+    def _reversals(start_date, end_date) -> list:
+        """
+        Rollups touched by reversal documents in the period, with the
+        reversals' share: (product_id, movement_type, day index, quantity,
+        value, reversed quantity, reversed value).
+        """
+        start, end = day_bounds(start_date, end_date)
+        reversed_totals = {}
+        items = MovementItem.objects.filter(
+            movement__status='VERIFIED',
+            movement__reversed_movement__isnull=False,
+            movement__created_at__gte=start,
+            movement__created_at__lt=end,
+        ).values_list('product_id', 'movement__movement_type', 'movement__created_at', 'quantity', ITEM_VALUE)
+        for product_id, movement_type, created_at, quantity, value in items:
+            key = (timezone.localdate(created_at), product_id, movement_type)
+            qty, total = reversed_totals.get(key, (0, 0))
+            reversed_totals[key] = (qty + quantity, total + float(value or 0))
+        if not reversed_totals:
+            return []
+
+        rollups = MovementDailyRollup.objects.filter(
+            date__in={key[0] for key in reversed_totals},
+            product_id__in={key[1] for key in reversed_totals},
+        ).values_list('date', 'product_id', 'movement_type', 'quantity', 'value')
+        return [
+            (product_id, movement_type, (day - start_date).days, quantity, float(value),
+             *reversed_totals[(day, product_id, movement_type)])
+            for day, product_id, movement_type, quantity, value in rollups
+            if (day, product_id, movement_type) in reversed_totals
+        ]
+
+    @staticmethod
+    def _index(product_ids, ids):
+        """Positions of `ids` in the sorted product_ids, and which were found."""
+        idx = np.searchsorted(product_ids, ids)
+        known = idx < len(product_ids)
+        known[known] = product_ids[idx[known]] == ids[known]
+        return idx, known
+
+    @staticmethod
+    def compute(data) -> dict:
+        """
+        Per-product metrics from load() output, aligned with `product_ids`:
+        daily_use, avg_qty, turnover (NaN without stock), cover_days (NaN
+        without consumption), share of the consumption value and abc class.
+        """
+        n = len(data['product_ids'])
+        days = data['days']
+        current_qty, out_qty, out_value = data['current_qty'], data['out_qty'], data['out_value']
+
+        avg_qty = current_qty - data['net_day_sum'] / days
+        daily_use = out_qty / days
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            turnover = np.where(avg_qty > 0, out_qty / avg_qty, np.nan)
+            cover_days = np.where(daily_use > 0, np.maximum(current_qty, 0) / daily_use, np.nan)
+
+        # ABC: rank by consumption value; a product is A while the value
+        # ranked above it is under 80% of the total, B under 95%, else C
+        order = np.argsort(-out_value, kind='stable')
+        total = out_value.sum()
+        share = out_value / total if total > 0 else np.zeros(n)
+        share_before = np.empty(n)
+        share_before[order] = np.cumsum(share[order]) - share[order]
+        abc = np.full(n, 'C')
+        abc[(share > 0) & (share_before < ABC_THRESHOLDS[1])] = 'B'
+        abc[(share > 0) & (share_before < ABC_THRESHOLDS[0])] = 'A'
+
+        return {
+            'order': order,
+            'daily_use': daily_use,
+            'avg_qty': avg_qty,
+            'turnover': turnover,
+            'cover_days': cover_days,
+            'share': share,
+            'abc': abc,
+        }
+
+    @staticmethod
+    def forecast(data, lead_days, service_z) -> dict:
+        """
+        Exponentially smoothed consumption per product from load(span=...)
+        output: daily_use, its standard deviation `sigma`, the reorder
+        point (demand over lead_days plus service_z sigmas of safety stock,
+        rounded up; NaN without consumption) and days_left until the
+        current stock runs out (NaN without consumption).
+        """
+        daily_use = data['out_weighted'] / data['weight_sum']
+        mean_square = data['out_weighted_square'] / data['weight_sum']
+        sigma = np.sqrt(np.maximum(mean_square - daily_use ** 2, 0))
+
+        consumed = daily_use > 0
+        reorder_point = np.where(
+            consumed, np.ceil(daily_use * lead_days + service_z * sigma * math.sqrt(lead_days)), np.nan
+        )
+        with np.errstate(divide='ignore', invalid='ignore'):
+            days_left = np.where(consumed, np.maximum(data['current_qty'], 0) / daily_use, np.nan)
+
+        return {
+            'daily_use': daily_use,
+            'sigma': sigma,
+            'reorder_point': reorder_point,
+            'days_left': days_left,
+        }
+
+    @staticmethod
+    def reorder_list(end_date) -> list:
+        """
+        Products due for reorder on end_date, most urgent first: stock at or
+        below the forecast reorder point, or below min_stock for products
+        without recent consumption. One tuple per product:
+        (sku, name, category, unit, current_qty, min_stock, daily_use,
+        reorder_point, stockout_date); daily_use and stockout_date are None
+        without consumption.
+        """
+        products = list(
+            Product.objects.order_by('id').values_list('id', 'sku', 'name', 'category__name', 'unit', 'min_stock')
+        )
+        start_date = end_date - timedelta(days=settings.FORECAST_WINDOW_DAYS - 1)
+        data = AnalyticsService.load(
+            start_date, end_date, [product[0] for product in products], span=settings.FORECAST_SPAN_DAYS
+        )
+        forecast = AnalyticsService.forecast(data, settings.REORDER_LEAD_DAYS, settings.REORDER_SERVICE_Z)
+
+        current_qty = data['current_qty']
+        min_stock = np.array([product[5] for product in products], dtype=float)
+        consumed = forecast['daily_use'] > 0
+        reorder_point = np.where(consumed, forecast['reorder_point'], min_stock)
+
+        # Most urgent first: by projected days left, then by stock
+        due = np.flatnonzero(current_qty <= reorder_point)
+        days_left = np.where(consumed, forecast['days_left'], np.inf)[due]
+        due = due[np.lexsort((current_qty[due], days_left))]
+
+        days_left = forecast['days_left'][due]
+        # Stock-out dates past ten years are noise, not a forecast
+        known = ~np.isnan(days_left) & (days_left < 3650)
+        stockout = np.datetime64(end_date, 'D') + np.where(known, np.floor(days_left), 0).astype(np.int64)
+        stockout = np.where(known, stockout.astype(object), None).tolist()
+        daily_use = forecast['daily_use'][due].round(2)
+        daily_use = np.where(consumed[due], daily_use, None).tolist()
+
+        return [
+            (*products[i][1:5], int(current_qty[i]), products[i][5], use, int(reorder_point[i]), date)
+            for i, use, date in zip(due.tolist(), daily_use, stockout)
+        ]
+
+    @staticmethod
+    def inventory_analytics(end_date, days) -> dict:
+        """
+        Metrics for the `days` days up to end_date (today for the report:
+        levels are traced back from the current stock, so movements after
+        end_date would shift avg_qty):
+        {'rows': row generator by consumption value, 'classes': {'A': n, ...},
+        'start_date', 'end_date'}.
+        Each row: abc, sku, name, category, unit, current_qty, in_qty,
+        out_qty, daily_use, avg_qty, turnover, cover_days, out_value, share %.
+        """
+        start_date = end_date - timedelta(days=days - 1)
+        products = {
+            pk: rest
+            for pk, *rest in Product.objects.order_by('id').values_list('id', 'sku', 'name', 'category__name', 'unit')
+        }
+        data = AnalyticsService.load(start_date, end_date, list(products))
+        metrics = AnalyticsService.compute(data)
+        classes, counts = np.unique(metrics['abc'], return_counts=True)
+
+        def rows():
+            order = metrics['order']
+
+            def column(values, decimals=None):
+                # Plain Python numbers in report order; NaN becomes an empty cell
+                values = values[order]
+                if decimals is None:
+                    return values.astype(np.int64).tolist()
+                values = values.round(decimals)
+                return np.where(np.isnan(values), None, values).tolist()
+
+            columns = [
+                column(data['current_qty']), column(data['in_qty']), column(data['out_qty']),
+                column(metrics['daily_use'], 2), column(metrics['avg_qty'], 1),
+                column(metrics['turnover'], 2), column(metrics['cover_days'], 0),
+                column(data['out_value'], 2), column(metrics['share'] * 100, 2),
+            ]
+            for i, (pk, abc) in enumerate(zip(data['product_ids'][order].tolist(), metrics['abc'][order].tolist())):
+                yield [abc, *products[pk], *(column[i] for column in columns)]
+
+        return {
+            'rows': rows(),
+            'classes': dict(zip(classes.tolist(), counts.tolist())),
+            'start_date': start_date,
+            'end_date': end_date,
+        }
@@ -0,0 +1,101 @@
+"""
+ETag helpers for conditional GET, and Range support for file downloads.
+
+Used with django.views.decorators.http.condition: the etag functions below
+only read version stamps or run one small query, so an unchanged resource
+is answered with 304 before the view does any real work.
+"""
+import hashlib
+import os
+import re
+from django.conf import settings
+from django.contrib import messages
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+from .versions import get_version
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def make_etag(*parts) -> str:
+    """Stable, opaque ETag from arbitrary parts."""
+    return hashlib.md5('|'.join(map(str, parts)).encode()).hexdigest()
+
+
+def versions_etag(request, *names, extra=()) -> str:
+    """ETag for JSON responses that depend on version stamps and the URL."""
+    return make_etag(
+        request.get_full_path(),
+        *(get_version(name) for name in names),
+        *extra
+    )
+
+
+def page_etag(request, *names, extra=()):
+    """
+    ETag for rendered pages. Pages also depend on the user (menu, roles)
+    and embed a CSRF token, so both are part of the tag. Pending flash
+    messages would be lost in a 304, so such requests are not tagged.
+    """
+    if len(messages.get_messages(request)):
+        return None
+    return versions_etag(
+        request, *names,
+        extra=(
+            request.user.pk,
+            getattr(request.user, 'role', ''),
+            request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+            *extra
+        )
+    )
+
+
+def ranged_file_response(request, file, filename, content_type):
+    """
+    Attachment response for an open binary file with single byte-range
+    support (resumed downloads, 206 Partial Content). The ETag is derived
+    from the file name and size; the files served here (report cache,
+    report jobs) get a new name whenever their content changes.
+    """
+    size = os.fstat(file.fileno()).st_size
+    etag = '"%s"' % make_etag(os.path.basename(file.name), size)
+
+    match = RANGE_RE.match(request.META.get('HTTP_RANGE', '').strip())
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not match or not any(match.groups()) or (if_range and if_range != etag):
+        response = FileResponse(file, as_attachment=True, filename=filename, content_type=content_type)
+        response['Accept-Ranges'] = 'bytes'
+        response['ETag'] = etag
+        return response
+
+    first, last = match.groups()
+    if first:
+        start, end = int(first), min(int(last) if last else size - 1, size - 1)
+    else:
+        # Suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    if start >= size or start > end:
+        file.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    def read_range(remaining):
+        try:
+            file.seek(start)
+            while remaining > 0:
+                chunk = file.read(min(FileResponse.block_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            file.close()
+
+    response = StreamingHttpResponse(read_range(end - start + 1), status=206, content_type=content_type)
+    response['Content-Length'] = str(end - start + 1)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    return response
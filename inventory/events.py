@@ -0,0 +1,82 @@
+"""
+In-process event broadcaster for live screens.
+
+StockService publishes compact events (movement verified/reversed, stock
+fell to its minimum) after its transaction commits. Every open dashboard
+or movement list waits on the same ring buffer, so one stock operation is
+one append plus a wake-up, however many screens are open.
+
+Events live only in this process's memory, which fits the single-process
+server the app runs under. Cursors carry a per-process stream id, so a
+client that reconnects after a restart is told to resync (`reset`).
+"""
+import threading
+import time
+import uuid
+from collections import deque
+from typing import NamedTuple
+
+
+class Event(NamedTuple):
+    id: int
+    type: str
+    created: float
+    data: dict
+
+    def as_dict(self) -> dict:
+        return {'id': self.id, 'type': self.type, 'created': self.created, 'data': self.data}
+
+
+class EventBroadcaster:
+    """Bounded, thread-safe event log with blocking waits."""
+
+    def __init__(self, size=1000):
+        self.stream = uuid.uuid4().hex[:8]
+        self._events = deque(maxlen=size)
+        self._condition = threading.Condition()
+        self._last_id = 0
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def cursor(self, event_id=None) -> str:
+        """Opaque client cursor for `event_id` (default: the latest)."""
+        return f'{self.stream}-{self._last_id if event_id is None else event_id}'
+
+    def parse_cursor(self, cursor):
+        """
+        Event id a client has seen, or None when the cursor is missing or
+        belongs to another stream (server restarted).
+        """
+        stream, _, event_id = (cursor or '').partition('-')
+        if stream != self.stream or not event_id.isdigit():
+            return None
+        return int(event_id)
+
+    def publish(self, event_type: str, **data) -> Event:
+        with self._condition:
+            self._last_id += 1
+            event = Event(self._last_id, event_type, time.time(), data)
+            self._events.append(event)
+            self._condition.notify_all()
+        return event
+
+    def since(self, event_id):
+        """
+        (events after `event_id`, reset). `reset` is True when the client
+        fell further behind than the buffer holds and has to reload.
+        """
+        with self._condition:
+            events = [event for event in self._events if event.id > event_id]
+            oldest = self._events[0].id if self._events else self._last_id + 1
+            return events, event_id < oldest - 1
+
+    def wait(self, event_id, timeout):
+        """Like since(), but blocks up to `timeout` seconds for new events."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._last_id > event_id, timeout)
+        return self.since(event_id)
+
+
+broadcaster = EventBroadcaster()
@@ -0,0 +1,140 @@
+"""
+CSV exports that never build model instances.
+
+CsvExport streams the rows of a values_list() queryset (stream_rows(): of
+any row iterable). On PostgreSQL the query runs as
+`COPY (...) TO STDOUT WITH (FORMAT csv)` and the server does the CSV
+encoding; a worker thread copies into a bounded queue that the
+response drains, so the download starts at once and memory stays flat.
+Other databases go through queryset.iterator() and csv.writer.
+
+Datetimes are written as local wall-clock time (DATETIME_FORMAT). COPY
+prints whatever the SQL returns, so querysets select them through
+aggregates.LocalDateTime on PostgreSQL; the iterator path converts them
+with timezone.localtime().
+"""
+import csv
+import queue
+import threading
+from datetime import datetime
+from django.db import connections
+from django.utils import timezone
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class ExportCancelled(Exception):
+    """The client went away; stop the COPY."""
+
+
+class _Echo:
+    """csv.writer target that hands back the formatted line."""
+
+    def write(self, value):
+        return value
+
+
+class CsvExport:
+    CHUNK_SIZE = 2000           # rows per fetch (iterator fallback)
+    BUFFER_BYTES = 64 * 1024    # bytes per yielded chunk
+    QUEUE_SIZE = 16             # chunks buffered ahead of the client
+
+    @staticmethod
+    def stream(queryset, headers):
+        """Header line, then the queryset's rows as CSV, in byte chunks."""
+        yield csv.writer(_Echo()).writerow(headers).encode('utf-8')
+        if connections[queryset.db].vendor == 'postgresql':
+            yield from CsvExport._copy_chunks(queryset)
+        else:
+            yield from CsvExport._iterator_chunks(queryset)
+
+    @staticmethod
+    def stream_rows(rows, headers):
+        """Header line, then an iterable of already built rows, in byte chunks."""
+        yield csv.writer(_Echo()).writerow(headers).encode('utf-8')
+        yield from CsvExport._row_chunks(rows)
+
+    @staticmethod
+    def _iterator_chunks(queryset):
+        return CsvExport._row_chunks(queryset.iterator(chunk_size=CsvExport.CHUNK_SIZE))
+
+    @staticmethod
+    def _row_chunks(rows):
+        writer = csv.writer(_Echo())
+        lines, size = [], 0
+        for row in rows:
+            line = writer.writerow([
+                timezone.localtime(value).strftime(DATETIME_FORMAT) if isinstance(value, datetime) else value
+                for value in row
+            ])
+            lines.append(line)
+            size += len(line)
+            if size >= CsvExport.BUFFER_BYTES:
+                yield ''.join(lines).encode('utf-8')
+                lines, size = [], 0
+        if lines:
+            yield ''.join(lines).encode('utf-8')
+
+    @staticmethod
+    def _copy_chunks(queryset):
+        sql, params = queryset.query.sql_with_params()
+        chunks = queue.Queue(maxsize=CsvExport.QUEUE_SIZE)
+        cancelled = threading.Event()
+
+        def put(item):
+            # Bounded wait, so a cancelled export never blocks the worker
+            while not cancelled.is_set():
+                try:
+                    chunks.put(item, timeout=1)
+                    return
+                except queue.Full:
+                    continue
+            raise ExportCancelled
+
+        class Writer:
+            def __init__(self):
+                self.parts, self.size = [], 0
+
+            def write(self, data):
+                self.parts.append(data)
+                self.size += len(data)
+                if self.size >= CsvExport.BUFFER_BYTES:
+                    self.flush()
+
+            def flush(self):
+                if self.parts:
+                    put(b''.join(self.parts))
+                    self.parts, self.size = [], 0
+
+        def copy():
+            # Own connection: Django connections belong to one thread
+            db = connections.create_connection(queryset.db)
+            try:
+                with db.cursor() as cursor:
+                    query = cursor.mogrify(sql, params).decode()
+                    writer = Writer()
+                    cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv)", writer)
+                    writer.flush()
+                put(None)
+            except ExportCancelled:
+                pass
+            except Exception as exc:
+                try:
+                    put(exc)
+                except ExportCancelled:
+                    pass
+            finally:
+                db.close()
+
+        worker = threading.Thread(target=copy, name='csv-copy', daemon=True)
+        worker.start()
+        try:
+            while True:
+                item = chunks.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            cancelled.set()
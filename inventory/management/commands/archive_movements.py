@@ -0,0 +1,221 @@
+"""
+Move closed months of movements out of the live tables.
+
+Each month older than MOVEMENT_HOT_MONTHS is:
+1. summarised into the daily rollups (so reports keep its totals),
+2. exported to backups/archive/movements_YYYY_MM.jsonl.gz,
+3. deleted from inventory_movement / inventory_movementitem in batches,
+4. recorded as an ArchivePeriod.
+
+Movements linked by a reversal stay in the live tables, so reversal
+history is never split. A month can be brought back with --restore.
+
+    python manage.py archive_movements --dry-run
+    python manage.py archive_movements
+    python manage.py archive_movements --restore 2025-01
+"""
+import gzip
+import hashlib
+import json
+import os
+from datetime import date, datetime, timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+from inventory.models import ArchivePeriod, Movement, MovementItem
+from inventory.rollups import RollupService, day_bounds
+from inventory.versions import MOVEMENTS, bump_version
+
+
+class ArchiveEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder cuts datetimes to milliseconds; keep them exact."""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def next_month(value: date) -> date:
+    return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+class Command(BaseCommand):
+    help = "Yopilgan oylar harakatlarini arxivga ko'chirish (yoki qaytarish)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=getattr(settings, 'MOVEMENT_HOT_MONTHS', 12),
+            help="Jadvallarda qoladigan oxirgi oylar soni"
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help="Bitta tranzaksiyada o'chiriladigan harakatlar soni"
+        )
+        parser.add_argument('--restore', metavar='YYYY-MM', help="Arxivlangan oyni jadvallarga qaytarish")
+        parser.add_argument('--list', action='store_true', help="Arxivlangan oylarni ko'rsatish")
+        parser.add_argument('--dry-run', action='store_true', help="Hech narsa o'zgartirmasdan rejani ko'rsatish")
+
+    def handle(self, *args, **options):
+        if options['list']:
+            for period in ArchivePeriod.objects.all():
+                self.stdout.write(f"{period.month:%Y-%m}: {period.movement_count} ta harakat, {period.file}")
+            return
+
+        if options['restore']:
+            self.restore(self._parse_month(options['restore']), options['dry_run'])
+            return
+
+        if options['months'] < 1:
+            raise CommandError("--months kamida 1 bo'lishi kerak")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size kamida 1 bo'lishi kerak")
+
+        # First month that stays in the live tables
+        cutoff = month_start(timezone.localdate())
+        for _ in range(options['months'] - 1):
+            cutoff = month_start(cutoff - timedelta(days=1))
+
+        first = Movement.objects.aggregate(first=Min('created_at'))['first']
+        if first is None:
+            self.stdout.write("Harakatlar yo'q")
+            return
+
+        month = month_start(timezone.localdate(first))
+        archived = 0
+        while month < cutoff:
+            if not ArchivePeriod.objects.filter(month=month).exists():
+                archived += self.archive(month, options['batch_size'], options['dry_run'])
+            month = next_month(month)
+
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"✅ Arxivlandi: {archived} ta harakat ({cutoff:%Y-%m} dan oldingi oylar)"))
+
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def month_movements(month):
+        start, end = day_bounds(month, next_month(month) - timedelta(days=1))
+        return Movement.objects.filter(
+            created_at__gte=start,
+            created_at__lt=end,
+            reversed_movement__isnull=True,
+            reversals__isnull=True,
+        ).order_by('pk')
+
+    @staticmethod
+    def archive_path(month):
+        archive_dir = os.path.join(settings.BASE_DIR, 'backups', 'archive')
+        os.makedirs(archive_dir, exist_ok=True)
+        return os.path.join(archive_dir, f"movements_{month:%Y_%m}.jsonl.gz")
+
+    def archive(self, month, batch_size, dry_run) -> int:
+        movements = self.month_movements(month)
+        total = movements.count()
+        if not total:
+            return 0
+        if dry_run:
+            self.stdout.write(f"{month:%Y-%m}: {total} ta harakat arxivlanadi")
+            return 0
+
+        # Totals first: once the rows are gone the month can't be rebuilt
+        RollupService.rebuild(month, next_month(month) - timedelta(days=1))
+
+        path = self.archive_path(month)
+        movement_count = item_count = 0
+        with gzip.open(path, 'wt', encoding='utf-8') as archive:
+            for movement in movements.values().iterator(chunk_size=batch_size):
+                movement['items'] = list(
+                    MovementItem.objects.filter(movement_id=movement['id'])
+                    .values('id', 'product_id', 'quantity', 'unit_price')
+                    .order_by('id')
+                )
+                archive.write(json.dumps(movement, cls=ArchiveEncoder, ensure_ascii=False))
+                archive.write('\n')
+                movement_count += 1
+                item_count += len(movement['items'])
+
+        checksum = self.checksum(path)
+        with transaction.atomic():
+            while True:
+                ids = list(movements.values_list('pk', flat=True)[:batch_size])
+                if not ids:
+                    break
+                Movement.objects.filter(pk__in=ids).delete()
+            ArchivePeriod.objects.create(
+                month=month,
+                file=os.path.relpath(path, settings.BASE_DIR),
+                checksum=checksum,
+                movement_count=movement_count,
+                item_count=item_count,
+            )
+            transaction.on_commit(lambda: bump_version(MOVEMENTS))
+
+        self.stdout.write(f"{month:%Y-%m}: {movement_count} ta harakat, {item_count} ta element → {path}")
+        return movement_count
+
+    def restore(self, month, dry_run):
+        try:
+            period = ArchivePeriod.objects.get(month=month)
+        except ArchivePeriod.DoesNotExist:
+            raise CommandError(f"{month:%Y-%m} arxivlanmagan")
+
+        path = os.path.join(settings.BASE_DIR, period.file)
+        if not os.path.exists(path):
+            raise CommandError(f"Arxiv fayli topilmadi: {path}")
+        if self.checksum(path) != period.checksum:
+            raise CommandError(f"Arxiv fayli o'zgargan (checksum mos emas): {path}")
+        if dry_run:
+            self.stdout.write(f"{month:%Y-%m}: {period.movement_count} ta harakat qaytariladi")
+            return
+
+        fields = {field.attname: field for field in Movement._meta.concrete_fields}
+        item_fields = {field.attname: field for field in MovementItem._meta.concrete_fields}
+        with transaction.atomic():
+            with gzip.open(path, 'rt', encoding='utf-8') as archive:
+                for line in archive:
+                    data = json.loads(line)
+                    items = data.pop('items')
+                    movement = Movement(**{
+                        name: fields[name].to_python(value) for name, value in data.items()
+                    })
+                    # save_base(raw=True) keeps the archived timestamps (no auto_now)
+                    movement.save_base(raw=True, force_insert=True)
+                    MovementItem.objects.bulk_create([
+                        MovementItem(movement_id=movement.id, **{
+                            name: item_fields[name].to_python(value) for name, value in item.items()
+                        })
+                        for item in items
+                    ])
+            period.delete()
+            transaction.on_commit(lambda: bump_version(MOVEMENTS))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {month:%Y-%m} qaytarildi: {period.movement_count} ta harakat, {period.item_count} ta element"
+        ))
+
+    @staticmethod
+    def checksum(path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _parse_month(value) -> date:
+        try:
+            return datetime.strptime(value, '%Y-%m').date()
+        except ValueError:
+            raise CommandError("Oy formati YYYY-MM bo'lishi kerak")
@@ -0,0 +1,83 @@
+"""
+Rebuild MovementDailyRollup from movement history.
+
+Needed once after the rollup table is introduced, and whenever rollups
+may have drifted (movements edited in the admin or the database). Each
+chunk of days is recomputed in its own transaction. Archived months
+(archive_movements) are skipped: their rows are gone, the rollups are
+all that is left of them:
+    python manage.py backfill_rollups
+    python manage.py backfill_rollups --start 2025-01-01 --end 2025-12-31
+"""
+from datetime import date, datetime, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+from inventory.models import ArchivePeriod, Movement
+from inventory.rollups import RollupService
+from inventory.versions import ROLLUPS, bump_version
+
+
+class Command(BaseCommand):
+    help = "Harakatlar tarixidan kunlik yig'indilarni qayta hisoblash"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help="Boshlanish sanasi (YYYY-MM-DD), standart: eng birinchi harakat")
+        parser.add_argument('--end', help="Tugash sanasi (YYYY-MM-DD), standart: bugun")
+        parser.add_argument(
+            '--chunk-days',
+            type=int,
+            default=31,
+            help="Bitta tranzaksiyada qayta hisoblanadigan kunlar soni"
+        )
+
+    def handle(self, *args, **options):
+        chunk_days = options['chunk_days']
+        if chunk_days < 1:
+            raise CommandError("--chunk-days kamida 1 bo'lishi kerak")
+
+        start = self._parse_date(options['start'], '--start')
+        end = self._parse_date(options['end'], '--end') or timezone.localdate()
+        if start is None:
+            first = Movement.objects.aggregate(first=Min('created_at'))['first']
+            if first is None:
+                self.stdout.write("Harakatlar yo'q")
+                return
+            start = timezone.localdate(first)
+        if start > end:
+            raise CommandError("--start --end dan keyin bo'lmasligi kerak")
+
+        archived = set(ArchivePeriod.objects.values_list('month', flat=True))
+
+        total = 0
+        chunk_start = start
+        while chunk_start <= end:
+            if chunk_start.replace(day=1) in archived:
+                chunk_start = (chunk_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+                continue
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end)
+            # Chunks stop at the day before the next archived month
+            next_month = (chunk_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+            while next_month <= chunk_end:
+                if next_month in archived:
+                    chunk_end = next_month - timedelta(days=1)
+                    break
+                next_month = (next_month + timedelta(days=31)).replace(day=1)
+            count = RollupService.rebuild(chunk_start, chunk_end)
+            total += count
+            self.stdout.write(f"{chunk_start} — {chunk_end}: {count} ta yozuv")
+            chunk_start = chunk_end + timedelta(days=1)
+
+        # Each chunk bumps ROLLUPS on commit; once more for the whole run
+        transaction.on_commit(lambda: bump_version(ROLLUPS))
+        self.stdout.write(self.style.SUCCESS(f"Tayyor: {total} ta kunlik yig'indi ({start} — {end})"))
+
+    @staticmethod
+    def _parse_date(value, option) -> date:
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f"{option}: sana formati YYYY-MM-DD bo'lishi kerak")
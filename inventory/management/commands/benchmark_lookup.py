@@ -0,0 +1,71 @@
+"""
+Benchmark the in-memory product index against the equivalent DB queries.
+
+Measures barcode lookups and name/SKU autocomplete with codes and prefixes
+sampled from the current catalog:
+    python manage.py benchmark_lookup --iterations 2000
+"""
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from inventory.models import Product
+from inventory.product_index import ProductLookupIndex, filter_by_code
+
+
+class Command(BaseCommand):
+    help = "Mahsulot indeksi va DB so'rovlari tezligini solishtirish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=1000, help="Har bir test uchun so'rovlar soni")
+        parser.add_argument('--limit', type=int, default=10, help="Autocomplete natijalari soni")
+        parser.add_argument('--seed', type=int, default=42, help="Tasodifiy namunalar uchun seed")
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        limit = options['limit']
+        if iterations < 1:
+            raise CommandError("--iterations kamida 1 bo'lishi kerak")
+
+        rows = list(Product.objects.values_list('barcode', 'name'))
+        if not rows:
+            raise CommandError("Mahsulotlar yo'q")
+
+        rng = random.Random(options['seed'])
+        codes = [rng.choice(rows)[0] for _ in range(iterations)]
+        prefixes = [self._prefix(rng, rng.choice(rows)[1]) for _ in range(iterations)]
+
+        # A private index so the benchmark does not disturb the shared one
+        index = ProductLookupIndex()
+        started = time.perf_counter()
+        index.lookup('')
+        self.stdout.write(f"Indeks qurildi: {len(rows)} ta mahsulot, {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        self._report('Shtrix kod / indeks', codes, index.lookup)
+        self._report('Shtrix kod / DB', codes, lambda code: filter_by_code(Product.objects, 'barcode', code).first())
+        self._report('Autocomplete / indeks', prefixes, lambda text: index.autocomplete(text, limit))
+        self._report('Autocomplete / DB', prefixes, lambda text: list(
+            Product.objects.filter(
+                Q(name__istartswith=text) | Q(sku__istartswith=text) | Q(name__icontains=f' {text}')
+            ).order_by('name')[:limit]
+        ))
+
+    @staticmethod
+    def _prefix(rng, name):
+        words = name.split() or ['']
+        word = rng.choice(words)
+        return word[:rng.randint(2, max(2, min(5, len(word))))]
+
+    def _report(self, label, samples, func):
+        timings = []
+        for sample in samples:
+            started = time.perf_counter_ns()
+            func(sample)
+            timings.append((time.perf_counter_ns() - started) / 1000)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"{label:24} o'rtacha {statistics.mean(timings):9.1f} µs | "
+            f"p50 {statistics.median(timings):9.1f} µs | p95 {p95:9.1f} µs"
+        )
@@ -0,0 +1,288 @@
+"""
+Benchmark report generation on a synthetic dataset.
+
+Each size is seeded deterministically into a fresh test database
+(`test_<NAME>`, created and dropped by the command; the real data is never
+touched), then the report builders are timed:
+    python manage.py benchmark_reports --sizes small medium
+    python manage.py benchmark_reports --sizes large --output benchmarks/v2.json
+
+For every step the JSON output records the best wall time of --repeat
+runs, the peak Python memory (tracemalloc, one extra run) and the number
+of queries. PDF chunks render in worker processes, so generate_pdf's peak
+only covers the main process. Compare files from two versions to spot
+regressions.
+
+Seeding and the steps run on a private in-memory cache, so the version
+stamps they bump (inventory/versions.py) and anything they cache never
+reach the shared cache of a running server.
+"""
+import json
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, time as day_time, timedelta
+from decimal import Decimal
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from inventory.analytics import AnalyticsService
+from inventory.models import Category, Movement, MovementItem, Product, Stock
+from inventory.reports import ReportService, RunningTotals, StockRow, STOCK_ROW_COLUMNS
+from inventory.rollups import RollupService
+
+# products, movements, items per movement; movements spread over DAYS
+SIZES = {
+    'small': (1_000, 10_000, 3),
+    'medium': (10_000, 100_000, 3),
+    'large': (10_000, 250_000, 4),
+}
+DAYS = 365
+CATEGORIES = 20
+BATCH_SIZE = 5000
+WORDS = [
+    'Olma', 'Non', 'Sut', 'Choy', 'Shakar', 'Guruch', 'Kabel', 'Lampa', 'Bolt', 'Gayka',
+    'Qog\'oz', 'Ruchka', 'Bo\'yoq', 'Sim', 'Truba', 'Kran', 'Filtr', 'Moy', 'Shina', 'Akkumulyator',
+]
+UNITS = ['dona', 'kg', 'metr', 'litr']
+
+# Replaces CACHES while the command runs; the shared stamps stay untouched
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark-reports',
+    }
+}
+
+
+@contextmanager
+def _keep_created_at():
+    """bulk_create() overwrites auto_now_add fields; keep the seeded dates."""
+    field = Movement._meta.get_field('created_at')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = "Hisobotlar tezligini sintetik ma'lumotlarda o'lchash (JSON natija)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            nargs='+',
+            choices=list(SIZES),
+            default=['small'],
+            help="Ma'lumotlar hajmi: " + ', '.join(
+                f"{name} ({products} mahsulot, {movements * items} element)"
+                for name, (products, movements, items) in SIZES.items()
+            )
+        )
+        parser.add_argument('--output', default='benchmark_reports.json', help="Natija fayli (JSON)")
+        parser.add_argument('--seed', type=int, default=42, help="Ma'lumotlar uchun seed")
+        parser.add_argument('--repeat', type=int, default=1, help="Har bir o'lchov necha marta takrorlanadi")
+        parser.add_argument('--pdf-rows', type=int, default=1000, help="PDF testidagi qatorlar soni")
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError("--repeat kamida 1 bo'lishi kerak")
+        if options['pdf_rows'] < 1:
+            raise CommandError("--pdf-rows kamida 1 bo'lishi kerak")
+
+        result = {
+            'created_at': timezone.now().isoformat(),
+            'commit': self._commit(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'seed': options['seed'],
+            'repeat': options['repeat'],
+            'sizes': {},
+        }
+        with override_settings(CACHES=BENCHMARK_CACHES):
+            for name in options['sizes']:
+                products, movements, items = SIZES[name]
+                self.stdout.write(f"== {name}: {products} mahsulot, {movements} harakat, {movements * items} element")
+                old_name = connection.settings_dict['NAME']
+                connection.creation.create_test_db(verbosity=0, autoclobber=True)
+                try:
+                    started = time.perf_counter()
+                    end_date = self._seed(random.Random(options['seed']), products, movements, items)
+                    size = {
+                        'products': products,
+                        'movements': movements,
+                        'items': movements * items,
+                        'seed_s': round(time.perf_counter() - started, 2),
+                        'steps': self._run_steps(end_date, options['repeat'], options['pdf_rows']),
+                    }
+                finally:
+                    connection.creation.destroy_test_db(old_name, verbosity=0)
+                result['sizes'][name] = size
+
+        with open(options['output'], 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"✅ Natija: {options['output']}"))
+
+    @staticmethod
+    def _commit():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def _seed(self, rng, product_count, movement_count, items_per_movement):
+        """Fill the empty test database; returns the last seeded day."""
+        user = get_user_model().objects.create(username='benchmark')
+        categories = Category.objects.bulk_create(
+            [Category(name=f"Kategoriya {i + 1}") for i in range(CATEGORIES)]
+        )
+        products = Product.objects.bulk_create(
+            [
+                Product(
+                    name=f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i + 1}",
+                    sku=f"BM-{i + 1:06d}",
+                    barcode=f"BM{i + 1:012d}",
+                    category=rng.choice(categories),
+                    unit=rng.choice(UNITS),
+                    min_stock=rng.randint(0, 50),
+                )
+                for i in range(product_count)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        # bulk_create() skips the signal that creates Stock rows
+        Stock.objects.bulk_create(
+            [Stock(product=product, current_qty=rng.randint(0, 500)) for product in products],
+            batch_size=BATCH_SIZE,
+        )
+        prices = [Decimal(rng.randint(100, 1_000_000)) / 100 for _ in products]
+
+        end_date = timezone.localdate()
+        start = timezone.make_aware(datetime.combine(end_date - timedelta(days=DAYS - 1), day_time.min))
+        seconds = sorted(rng.randrange(DAYS * 24 * 3600) for _ in range(movement_count))
+        with _keep_created_at():
+            for offset in range(0, movement_count, BATCH_SIZE):
+                batch = Movement.objects.bulk_create([
+                    Movement(
+                        movement_type='IN' if rng.random() < 0.4 else 'OUT',
+                        status='VERIFIED',
+                        performed_by=user,
+                        created_at=start + timedelta(seconds=second),
+                        note=rng.choice(['', '', 'Buyurtma bo\'yicha', 'Qayta hisob']),
+                    )
+                    for second in seconds[offset:offset + BATCH_SIZE]
+                ])
+                MovementItem.objects.bulk_create(
+                    [
+                        MovementItem(
+                            movement=movement,
+                            product=products[index],
+                            quantity=rng.randint(1, 20),
+                            unit_price=prices[index],
+                        )
+                        for movement in batch
+                        for index in rng.sample(range(product_count), items_per_movement)
+                    ],
+                    batch_size=BATCH_SIZE,
+                )
+        RollupService.rebuild(end_date - timedelta(days=DAYS - 1), end_date)
+        return end_date
+
+    def _run_steps(self, end_date, repeat, pdf_rows):
+        start = timezone.make_aware(datetime.combine(end_date - timedelta(days=DAYS - 1), day_time.min))
+        end = timezone.make_aware(datetime.combine(end_date, day_time.max))
+
+        # Renderer inputs are built up front, so only the renderer is timed
+        movement_rows = [
+            [row.id, row.type_label, row.created_at.strftime("%Y-%m-%d %H:%M"), row.username, row.employee, row.items, row.note]
+            for row in ReportService.get_movement_report_data(start, end)['rows']
+        ]
+        stock_rows = [
+            StockRow._make(values)
+            for values in Stock.objects.order_by('product__category__name', 'product__name')
+            .values_list(*STOCK_ROW_COLUMNS)[:pdf_rows]
+        ]
+        totals = RunningTotals()
+        totals.count = len(stock_rows)
+        totals.quantity = sum(row.current_qty for row in stock_rows)
+        pdf_context = {
+            'rows': stock_rows,
+            'totals': totals,
+            'generated_at': timezone.now(),
+            'title': "Ombor Qoldig'i Hisoboti",
+        }
+
+        def consume(rows):
+            return sum(1 for _ in rows)
+
+        steps = [
+            ('get_stock_report_data', lambda: consume(ReportService.get_stock_report_data()['rows'])),
+            ('get_movement_report_data', lambda: consume(ReportService.get_movement_report_data(start, end)['rows'])),
+            ('get_low_stock_report_data', lambda: consume(ReportService.get_low_stock_report_data(end_date)['rows'])),
+            ('analytics_load_compute', lambda: self._analytics(end_date)),
+            ('generate_excel', lambda: self._excel(movement_rows)),
+            ('generate_pdf', lambda: self._pdf(pdf_context)),
+        ]
+        results = {}
+        for name, func in steps:
+            results[name] = self._measure(func, repeat)
+            step = results[name]
+            self.stdout.write(
+                f"{name:26} {step['wall_s']:8.3f} s | {step['peak_mb']:8.1f} MB | "
+                f"{step['queries']:4} so'rov | {step['rows']} qator"
+            )
+        return results
+
+    @staticmethod
+    def _analytics(end_date):
+        # Database sums and NumPy metrics together, over the whole seeded year
+        data = AnalyticsService.load(end_date - timedelta(days=DAYS - 1), end_date)
+        AnalyticsService.compute(data)
+        return len(data['product_ids'])
+
+    @staticmethod
+    def _excel(rows):
+        headers = ['ID', 'Turi', 'Sana', 'Foydalanuvchi', 'Xodim (Face ID)', 'Mahsulotlar', 'Izoh']
+        ReportService.generate_excel(rows, headers, sheet_name="Harakatlar", title="Benchmark").close()
+        return len(rows)
+
+    @staticmethod
+    def _pdf(context):
+        output = ReportService.generate_pdf('inventory/reports/stock_pdf.html', context, 'rows')
+        if output is None:
+            raise CommandError("PDF yaratishda xatolik")
+        return len(context['rows'])
+
+    @staticmethod
+    def _measure(func, repeat):
+        """Best wall time of `repeat` runs, then one traced run for memory and queries."""
+        wall = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = func()
+            elapsed = time.perf_counter() - started
+            wall = elapsed if wall is None else min(wall, elapsed)
+
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return {
+            'wall_s': round(wall, 4),
+            'peak_mb': round(peak / (1024 * 1024), 2),
+            'queries': len(queries),
+            'rows': rows,
+        }
@@ -0,0 +1,82 @@
+"""
+Compact the catalog change log used by scanner station sync.
+
+Every product save appends a CatalogChange row, so the log grows with every
+edit. A delta only needs to know whether a product changed after the
+station's version, and that is decided by the product's newest row alone:
+older rows of a product that changed again are dropped. Deltas stay exact
+for stations offline any length of time; only the last --days of history
+are kept row by row.
+
+Run daily from Task Scheduler / cron:
+    python manage.py compact_catalog_changes
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from inventory.models import CatalogChange
+
+
+class Command(BaseCommand):
+    help = "Katalog o'zgarishlari jurnalini ixchamlash (har mahsulotga eng so'nggi yozuv)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'CATALOG_CHANGE_RETENTION_DAYS', 30),
+            help="Necha kundan eski yozuvlar ixchamlanadi"
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help="Bitta so'rovda o'chiriladigan yozuvlar soni"
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Hech narsa o'chirmasdan faqat sonini ko'rsatish"
+        )
+
+    def handle(self, *args, **options):
+        days = options['days']
+        batch_size = options['batch_size']
+        if days < 1:
+            raise CommandError("--days kamida 1 bo'lishi kerak")
+        if batch_size < 1:
+            raise CommandError("--batch-size kamida 1 bo'lishi kerak")
+
+        cutoff = timezone.now() - timedelta(days=days)
+        candidates = self.get_candidates(cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(
+                f"{candidates.count()} ta yozuv o'chiriladi "
+                f"({timezone.localtime(cutoff):%Y-%m-%d %H:%M} dan eski)"
+            )
+            return
+
+        deleted = 0
+        while True:
+            ids = list(candidates.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            deleted += CatalogChange.objects.filter(pk__in=ids).delete()[0]
+            self.stdout.write(f"  ... {deleted} ta yozuv o'chirildi")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Ixchamlash tugadi!\n"
+                f"   O'chirildi: {deleted}\n"
+                f"   Qoldi: {CatalogChange.objects.count()}"
+            )
+        )
+
+    @staticmethod
+    def get_candidates(cutoff):
+        """Changes older than cutoff superseded by a newer change of the same product."""
+        newer = CatalogChange.objects.filter(product_id=OuterRef('product_id'), pk__gt=OuterRef('pk'))
+        return CatalogChange.objects.filter(created_at__lt=cutoff).filter(Exists(newer)).order_by('pk')
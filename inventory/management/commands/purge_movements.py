@@ -0,0 +1,146 @@
+"""
+Purge abandoned PENDING/CANCELLED movements.
+
+PENDING documents that nobody finalized and CANCELLED documents never
+touched stock, so once they are older than the retention window they only
+slow down movement_list and the status indexes. Reversal-linked movements
+(originals that were reversed and the reversals themselves) are kept.
+
+Run daily from Task Scheduler / cron:
+    python manage.py purge_movements --archive
+"""
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from inventory.models import Movement, MovementItem
+
+
+class Command(BaseCommand):
+    help = "Eski PENDING/CANCELLED harakatlarni tozalash (batch bo'yicha)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'MOVEMENT_RETENTION_DAYS', 30),
+            help="Necha kundan eski harakatlar o'chiriladi"
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help="Bitta tranzaksiyada o'chiriladigan harakatlar soni"
+        )
+        parser.add_argument(
+            '--empty-only',
+            action='store_true',
+            help="Faqat bo'sh (mahsulotsiz) harakatlarni o'chirish"
+        )
+        parser.add_argument(
+            '--archive',
+            action='store_true',
+            help="O'chirishdan oldin backups/ papkasiga .jsonl.gz arxiv yozish"
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Hech narsa o'chirmasdan faqat sonini ko'rsatish"
+        )
+
+    def handle(self, *args, **options):
+        days = options['days']
+        batch_size = options['batch_size']
+        if days < 1:
+            raise CommandError("--days kamida 1 bo'lishi kerak")
+        if batch_size < 1:
+            raise CommandError("--batch-size kamida 1 bo'lishi kerak")
+
+        cutoff = timezone.now() - timedelta(days=days)
+        candidates = self.get_candidates(cutoff, options['empty_only'])
+
+        if options['dry_run']:
+            total = candidates.count()
+            items = MovementItem.objects.filter(movement__in=candidates).count()
+            self.stdout.write(
+                f"{total} ta harakat ({items} ta element) o'chiriladi "
+                f"({timezone.localtime(cutoff):%Y-%m-%d %H:%M} dan eski)"
+            )
+            return
+
+        archive = self.open_archive() if options['archive'] else None
+        movements_deleted = 0
+        items_deleted = 0
+
+        try:
+            while True:
+                ids = list(candidates.values_list('pk', flat=True)[:batch_size])
+                if not ids:
+                    break
+
+                with transaction.atomic():
+                    batch = Movement.objects.filter(pk__in=ids)
+                    if archive:
+                        self.write_archive(archive, batch)
+                    _, per_model = batch.delete()
+
+                movements_deleted += per_model.get(Movement._meta.label, 0)
+                items_deleted += per_model.get(MovementItem._meta.label, 0)
+                self.stdout.write(f"  ... {movements_deleted} ta harakat o'chirildi")
+        finally:
+            if archive:
+                archive.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Tozalash tugadi!\n"
+                f"   Harakatlar: {movements_deleted}\n"
+                f"   Elementlar: {items_deleted}"
+            )
+        )
+        if archive:
+            self.stdout.write(f"   Arxiv: {archive.name}")
+
+    @staticmethod
+    def get_candidates(cutoff, empty_only=False):
+        """
+        Old PENDING/CANCELLED movements without any reversal link.
+
+        updated_at is used instead of created_at so a PENDING document that
+        is still being filled is never treated as abandoned.
+        """
+        candidates = Movement.objects.filter(
+            status__in=['PENDING', 'CANCELLED'],
+            updated_at__lt=cutoff,
+            reversed_movement__isnull=True,
+            reversals__isnull=True,
+        )
+        if empty_only:
+            candidates = candidates.filter(items__isnull=True)
+        return candidates.order_by('pk')
+
+    @staticmethod
+    def open_archive():
+        backup_dir = os.path.join(settings.BASE_DIR, 'backups')
+        os.makedirs(backup_dir, exist_ok=True)
+        filename = f"purged_movements_{datetime.now():%Y%m%d_%H%M%S}.jsonl.gz"
+        return gzip.open(os.path.join(backup_dir, filename), 'wt', encoding='utf-8')
+
+    @staticmethod
+    def write_archive(archive, batch):
+        """Write one JSON line per movement with its items embedded."""
+        items_by_movement = {}
+        for item in MovementItem.objects.filter(movement__in=batch).values(
+            'movement_id', 'product_id', 'quantity', 'unit_price'
+        ):
+            items_by_movement.setdefault(item.pop('movement_id'), []).append(item)
+
+        for movement in batch.values():
+            movement['items'] = items_by_movement.get(movement['id'], [])
+            archive.write(json.dumps(movement, cls=DjangoJSONEncoder, ensure_ascii=False))
+            archive.write('\n')
@@ -0,0 +1,62 @@
+"""
+Render queued reports (ReportJob) in a separate process.
+
+Keeps the web process free while large PDF/Excel reports are built. Run
+it next to the server (Task Scheduler at startup / systemd):
+    python manage.py run_report_worker
+    python manage.py run_report_worker --once     # drain the queue and exit
+"""
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from inventory.report_jobs import ReportJobService
+
+# Seconds between expiry / stale-job sweeps
+HOUSEKEEPING_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = "Navbatdagi hisobotlarni fonda tayyorlash"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help="Navbat bo'sh bo'lganda kutish vaqti (soniya)"
+        )
+        parser.add_argument('--once', action='store_true', help="Navbatni bo'shatib, to'xtash")
+
+    def handle(self, *args, **options):
+        if options['interval'] <= 0:
+            raise CommandError("--interval musbat bo'lishi kerak")
+
+        self.stdout.write("Hisobot worker ishga tushdi")
+        last_housekeeping = 0
+        try:
+            while True:
+                close_old_connections()
+                ReportJobService.heartbeat()
+                if time.monotonic() - last_housekeeping >= HOUSEKEEPING_INTERVAL:
+                    failed = ReportJobService.fail_stale()
+                    purged = ReportJobService.purge_expired()
+                    if failed or purged:
+                        self.stdout.write(f"Tozalandi: {purged} ta eskirgan, {failed} ta to'xtab qolgan")
+                    last_housekeeping = time.monotonic()
+
+                job = ReportJobService.claim_next()
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
+                    continue
+
+                started = time.monotonic()
+                job = ReportJobService.run(job)
+                elapsed = time.monotonic() - started
+                if job.status == 'DONE':
+                    self.stdout.write(self.style.SUCCESS(f"✅ #{job.pk} {job.filename} ({elapsed:.1f} s)"))
+                else:
+                    self.stdout.write(self.style.ERROR(f"❌ #{job.pk} {job.report_type}/{job.format}: {job.error}"))
+        except KeyboardInterrupt:
+            self.stdout.write("To'xtatildi")
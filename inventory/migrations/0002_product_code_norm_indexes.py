@@ -0,0 +1,22 @@
+# Generated by Django 4.2.28 on 2026-10-19 03:11
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(django.db.models.functions.text.Upper(django.db.models.functions.text.Trim('barcode')), name='product_barcode_norm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(django.db.models.functions.text.Upper(django.db.models.functions.text.Trim('sku')), name='product_sku_norm_idx'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+from django.db import migrations
+
+# Frozen copy of the DDL in inventory/search.py as of this migration:
+# later edits to that module must not change what this migration does.
+SEARCH_FIELDS = ('name', 'sku', 'barcode')
+FTS_TABLE = 'inventory_product_fts'
+
+INSTALL = {
+    'postgresql': [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    ] + [
+        f"CREATE INDEX IF NOT EXISTS product_{field}_trgm_idx "
+        f"ON inventory_product USING gin (UPPER({field}) gin_trgm_ops)"
+        for field in SEARCH_FIELDS
+    ],
+    'sqlite': [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            name, sku, barcode,
+            content='inventory_product', content_rowid='id', tokenize='trigram'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON inventory_product BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, name, sku, barcode)
+            VALUES (new.id, new.name, new.sku, new.barcode);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON inventory_product BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, sku, barcode)
+            VALUES ('delete', old.id, old.name, old.sku, old.barcode);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON inventory_product BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, sku, barcode)
+            VALUES ('delete', old.id, old.name, old.sku, old.barcode);
+            INSERT INTO {FTS_TABLE}(rowid, name, sku, barcode)
+            VALUES (new.id, new.name, new.sku, new.barcode);
+        END""",
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+    ],
+}
+
+UNINSTALL = {
+    'postgresql': [
+        f"DROP INDEX IF EXISTS product_{field}_trgm_idx" for field in SEARCH_FIELDS
+    ],
+    'sqlite': [
+        f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+        f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+        f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+        f"DROP TABLE IF EXISTS {FTS_TABLE}",
+    ],
+}
+
+
+def run(statements):
+    def apply(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return apply
+
+
+class Migration(migrations.Migration):
+    """
+    pg_trgm GIN indexes on PostgreSQL, FTS5 trigram shadow table on SQLite.
+    See inventory/search.py.
+    """
+
+    dependencies = [
+        ('inventory', '0002_product_code_norm_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(INSTALL), run(UNINSTALL)),
+    ]
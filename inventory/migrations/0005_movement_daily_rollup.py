@@ -0,0 +1,35 @@
+# Generated by Django 4.2.28 on 2026-10-19 03:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_catalog_change'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovementDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Sana')),
+                ('movement_type', models.CharField(choices=[('IN', 'Kirim'), ('OUT', 'Chiqim')], max_length=10, verbose_name='Turi')),
+                ('quantity', models.BigIntegerField(default=0, verbose_name='Miqdor')),
+                ('value', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='Qiymat')),
+                ('document_count', models.IntegerField(default=0, verbose_name='Hujjatlar soni')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='daily_rollups', to='inventory.product', verbose_name='Mahsulot')),
+            ],
+            options={
+                'verbose_name': "Kunlik yig'indi",
+                'verbose_name_plural': "Kunlik yig'indilar",
+                'indexes': [models.Index(fields=['product', 'date'], name='inventory_m_product_832c98_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='movementdailyrollup',
+            constraint=models.UniqueConstraint(fields=('date', 'product', 'movement_type'), name='rollup_date_product_type_uniq'),
+        ),
+    ]
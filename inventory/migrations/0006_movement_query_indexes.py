@@ -0,0 +1,25 @@
+# Generated by Django 4.2.28 on 2026-10-19 03:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_movement_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movement',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['performed_by', 'movement_type', '-created_at'], name='movement_pending_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movement',
+            index=models.Index(condition=models.Q(('status', 'VERIFIED')), fields=['movement_type', 'created_at'], name='movement_verified_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movement',
+            index=models.Index(condition=models.Q(('status', 'VERIFIED')), fields=['created_at'], name='movement_verified_date_idx'),
+        ),
+    ]
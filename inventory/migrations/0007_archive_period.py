@@ -0,0 +1,30 @@
+# Generated by Django 4.2.28 on 2026-10-19 03:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_movement_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivePeriod',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(unique=True, verbose_name='Oy')),
+                ('file', models.CharField(max_length=255, verbose_name='Arxiv fayli')),
+                ('checksum', models.CharField(max_length=64, verbose_name='SHA-256')),
+                ('movement_count', models.IntegerField(default=0, verbose_name='Harakatlar soni')),
+                ('item_count', models.IntegerField(default=0, verbose_name='Elementlar soni')),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Arxivlangan davr',
+                'verbose_name_plural': 'Arxivlangan davrlar',
+                'ordering': ['-month'],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.28 on 2026-10-19 03:39
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('inventory', '0007_archive_period'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_type', models.CharField(choices=[('stock', "Ombor qoldig'i"), ('movement', 'Harakatlar'), ('low_stock', 'Kamomat')], max_length=20, verbose_name='Hisobot')),
+                ('format', models.CharField(choices=[('excel', 'Excel'), ('pdf', 'PDF'), ('csv', 'CSV')], max_length=10, verbose_name='Format')),
+                ('params', models.JSONField(blank=True, default=dict, verbose_name='Parametrlar')),
+                ('params_hash', models.CharField(max_length=64, verbose_name='Parametrlar xeshi')),
+                ('status', models.CharField(choices=[('PENDING', 'Navbatda'), ('RUNNING', 'Tayyorlanmoqda'), ('DONE', 'Tayyor'), ('FAILED', 'Xatolik')], default='PENDING', max_length=10, verbose_name='Holat')),
+                ('file', models.CharField(blank=True, max_length=255, verbose_name='Fayl')),
+                ('filename', models.CharField(blank=True, max_length=255, verbose_name='Yuklab olish nomi')),
+                ('content_type', models.CharField(blank=True, max_length=100)),
+                ('error', models.TextField(blank=True, verbose_name='Xatolik')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='report_jobs', to=settings.AUTH_USER_MODEL, verbose_name="So'ragan")),
+            ],
+            options={
+                'verbose_name': 'Hisobot vazifasi',
+                'verbose_name_plural': 'Hisobot vazifalari',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='inventory_r_status_6a8568_idx'), models.Index(fields=['requested_by', '-created_at'], name='inventory_r_request_028555_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='reportjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['PENDING', 'RUNNING'])), fields=('params_hash',), name='reportjob_inflight_uniq'),
+        ),
+    ]
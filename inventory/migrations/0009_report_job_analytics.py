@@ -0,0 +1,18 @@
+# Generated by Django 4.2.28 on 2026-10-19 03:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_report_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportjob',
+            name='report_type',
+            field=models.CharField(choices=[('stock', "Ombor qoldig'i"), ('movement', 'Harakatlar'), ('low_stock', 'Kamomat'), ('analytics', 'Tahlil (ABC)')], max_length=20, verbose_name='Hisobot'),
+        ),
+    ]
@@ -2,11 +2,17 @@
 Inventory models for warehouse management.
 - Employee: Face ID registration
 - Category, Product: Product catalog
+- CatalogChange: Catalog change log for scanner station sync
 - Stock: Current inventory levels
 - Movement, MovementItem: Stock movements (IN/OUT)
+- MovementDailyRollup: Per-day, per-product totals of VERIFIED movements
+- ArchivePeriod: Months moved out of the movement tables
+- ReportJob: Background report rendering
 """
 import uuid
+from decimal import Decimal
 from django.db import models
+from django.db.models.functions import Cast, Coalesce, Concat, Trim, Upper
 from django.conf import settings
 
 
@@ -74,12 +80,37 @@ class Product(models.Model):
         indexes = [
             models.Index(fields=['category']),
             models.Index(fields=['name']),
+            # Case-insensitive scanner lookups (see product_index.normalized)
+            models.Index(Upper(Trim('barcode')), name='product_barcode_norm_idx'),
+            models.Index(Upper(Trim('sku')), name='product_sku_norm_idx'),
         ]
 
     def __str__(self):
         return f"{self.name} ({self.sku})"
 
 
+class CatalogChange(models.Model):
+    """
+    Append-only log of product changes. The id is the catalog version:
+    stations that synced up to version N ask for products changed after N.
+    Rows outlive their product (no FK) so deletions can be synced too.
+    """
+    product_id = models.BigIntegerField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Katalog o'zgarishi"
+        verbose_name_plural = "Katalog o'zgarishlari"
+
+    def __str__(self):
+        return f"#{self.id}: {self.product_id}"
+
+    @classmethod
+    def record(cls, product_ids):
+        """Log a change for every product id in `product_ids`."""
+        cls.objects.bulk_create([cls(product_id=product_id) for product_id in product_ids])
+
+
 class Stock(models.Model):
     """Current stock levels. Auto-created via signal when Product is created."""
     product = models.OneToOneField(
@@ -107,8 +138,44 @@ class Stock(models.Model):
         return self.current_qty <= self.product.min_stock
 
 
+class MovementQuerySet(models.QuerySet):
+    def with_totals(self):
+        """
+        Annotate item_count, quantity_sum and value_sum in SQL, so lists
+        don't query (or prefetch) items per movement.
+        """
+        return self.annotate(
+            item_count=models.Count('items'),
+            quantity_sum=Coalesce(models.Sum('items__quantity'), 0),
+            value_sum=Coalesce(
+                models.Sum(
+                    models.F('items__quantity') * models.F('items__unit_price'),
+                    output_field=models.DecimalField(max_digits=18, decimal_places=2)
+                ),
+                Decimal('0'),
+                output_field=models.DecimalField(max_digits=18, decimal_places=2)
+            ),
+        )
+
+    def with_summary(self, separator=', '):
+        """Annotate items_summary: "Name (qty), Name (qty)" built by the database."""
+        from .aggregates import GroupConcat
+        item_label = Concat(
+            'items__product__name', models.Value(' ('),
+            Cast('items__quantity', models.CharField()), models.Value(')'),
+            output_field=models.CharField()
+        )
+        return self.annotate(
+            items_summary=GroupConcat(
+                # NULL (skipped) for movements without items
+                models.Case(models.When(items__isnull=False, then=item_label)),
+                separator=separator
+            )
+        )
+
+
 class Movement(models.Model):
-    """Stock movement record. Never deleted - use reversal instead."""
+    """Stock movement record. VERIFIED movements are never deleted - use reversal instead."""
     
     MOVEMENT_TYPES = [
         ('IN', 'Kirim'),
@@ -171,6 +238,8 @@ class Movement(models.Model):
         verbose_name="Bekor qilingan movement"
     )
 
+    objects = MovementQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Harakat"
         verbose_name_plural = "Harakatlar"
@@ -180,18 +249,47 @@ class Movement(models.Model):
             models.Index(fields=['face_employee']),
             models.Index(fields=['movement_type']),
             models.Index(fields=['status']),
+            # "My open IN/OUT document": movement_in/out, create_movement
+            models.Index(
+                fields=['performed_by', 'movement_type', '-created_at'],
+                condition=models.Q(status='PENDING'),
+                name='movement_pending_user_idx'
+            ),
+            # Reports and dashboard: VERIFIED in a date range, per type or all
+            models.Index(
+                fields=['movement_type', 'created_at'],
+                condition=models.Q(status='VERIFIED'),
+                name='movement_verified_type_idx'
+            ),
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(status='VERIFIED'),
+                name='movement_verified_date_idx'
+            ),
         ]
 
     def __str__(self):
         return f"{self.get_movement_type_display()} #{self.id} - {self.get_status_display()}"
     
+    # The properties below use the with_totals() annotations when present
+    
     @property
     def total_items(self):
+        if 'item_count' in self.__dict__:
+            return self.item_count
         return self.items.count()
     
     @property
     def total_quantity(self):
+        if 'quantity_sum' in self.__dict__:
+            return self.quantity_sum
         return sum(item.quantity for item in self.items.all())
+    
+    @property
+    def total_value(self):
+        if 'value_sum' in self.__dict__:
+            return self.value_sum
+        return sum((item.total_price for item in self.items.all()), Decimal('0'))
 
 
 class MovementItem(models.Model):
@@ -230,3 +328,148 @@ class MovementItem(models.Model):
     @property
     def total_price(self):
         return self.quantity * self.unit_price
+
+
+class MovementDailyRollup(models.Model):
+    """
+    Totals of VERIFIED movement items per local day, product and type.
+    Maintained by StockService; rebuilt by `manage.py backfill_rollups`.
+    """
+    date = models.DateField(verbose_name="Sana")
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.PROTECT,
+        related_name='daily_rollups',
+        verbose_name="Mahsulot"
+    )
+    movement_type = models.CharField(
+        max_length=10,
+        choices=Movement.MOVEMENT_TYPES,
+        verbose_name="Turi"
+    )
+    quantity = models.BigIntegerField(default=0, verbose_name="Miqdor")
+    value = models.DecimalField(
+        max_digits=18,
+        decimal_places=2,
+        default=0,
+        verbose_name="Qiymat"
+    )
+    document_count = models.IntegerField(default=0, verbose_name="Hujjatlar soni")
+
+    class Meta:
+        verbose_name = "Kunlik yig'indi"
+        verbose_name_plural = "Kunlik yig'indilar"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'product', 'movement_type'],
+                name='rollup_date_product_type_uniq'
+            ),
+        ]
+        indexes = [
+            # Date range scans use the unique constraint's index
+            models.Index(fields=['product', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.product_id} {self.movement_type}: {self.quantity}"
+
+
+class ArchivePeriod(models.Model):
+    """
+    A closed month whose movements were exported to a compressed file and
+    removed from the movement tables (`manage.py archive_movements`).
+    Daily rollups for the month are kept, so totals stay available.
+    """
+    month = models.DateField(unique=True, verbose_name="Oy")  # first day of the month
+    file = models.CharField(max_length=255, verbose_name="Arxiv fayli")
+    checksum = models.CharField(max_length=64, verbose_name="SHA-256")
+    movement_count = models.IntegerField(default=0, verbose_name="Harakatlar soni")
+    item_count = models.IntegerField(default=0, verbose_name="Elementlar soni")
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Arxivlangan davr"
+        verbose_name_plural = "Arxivlangan davrlar"
+        ordering = ['-month']
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} ({self.movement_count} ta harakat)"
+
+
+class ReportJob(models.Model):
+    """
+    A report rendered in the background by `manage.py run_report_worker`.
+    Identical jobs (same type, format and parameters) are not queued twice
+    while one is pending or running; the artifact is kept in
+    MEDIA_ROOT/reports/ until `expires_at`.
+    """
+
+    REPORT_TYPES = [
+        ('stock', "Ombor qoldig'i"),
+        ('movement', 'Harakatlar'),
+        ('low_stock', 'Kamomat'),
+        ('analytics', 'Tahlil (ABC)'),
+    ]
+
+    FORMATS = [
+        ('excel', 'Excel'),
+        ('pdf', 'PDF'),
+        ('csv', 'CSV'),
+    ]
+
+    STATUS_CHOICES = [
+        ('PENDING', 'Navbatda'),
+        ('RUNNING', 'Tayyorlanmoqda'),
+        ('DONE', 'Tayyor'),
+        ('FAILED', 'Xatolik'),
+    ]
+
+    report_type = models.CharField(max_length=20, choices=REPORT_TYPES, verbose_name="Hisobot")
+    format = models.CharField(max_length=10, choices=FORMATS, verbose_name="Format")
+    params = models.JSONField(default=dict, blank=True, verbose_name="Parametrlar")
+    params_hash = models.CharField(max_length=64, verbose_name="Parametrlar xeshi")
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='PENDING',
+        verbose_name="Holat"
+    )
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='report_jobs',
+        verbose_name="So'ragan"
+    )
+
+    # Artifact, relative to MEDIA_ROOT
+    file = models.CharField(max_length=255, blank=True, verbose_name="Fayl")
+    filename = models.CharField(max_length=255, blank=True, verbose_name="Yuklab olish nomi")
+    content_type = models.CharField(max_length=100, blank=True)
+    error = models.TextField(blank=True, verbose_name="Xatolik")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Hisobot vazifasi"
+        verbose_name_plural = "Hisobot vazifalari"
+        ordering = ['-created_at']
+        constraints = [
+            # At most one in-flight job per parameter set
+            models.UniqueConstraint(
+                fields=['params_hash'],
+                condition=models.Q(status__in=['PENDING', 'RUNNING']),
+                name='reportjob_inflight_uniq'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['requested_by', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.report_type}/{self.format} ({self.status})"
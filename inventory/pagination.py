@@ -0,0 +1,152 @@
+"""
+Keyset (cursor) pagination for long lists.
+
+Django's Paginator runs COUNT(*) and OFFSET, so deep pages get slower as the
+table grows. KeysetPaginator instead remembers the ordering key of the
+first/last row of the page in an opaque signed cursor and continues with
+`WHERE key > last_key ... LIMIT n`, which costs the same on every page.
+"""
+import json
+from datetime import datetime
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.db.models import Q
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder drops microseconds, which keyset comparisons need."""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class _CursorSerializer:
+    def dumps(self, obj):
+        return json.dumps(obj, cls=_CursorEncoder, separators=(',', ':')).encode('latin-1')
+
+    def loads(self, data):
+        return json.loads(data.decode('latin-1'))
+
+
+class KeysetPage:
+    """One page of results; iterable like a Paginator page."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, estimated_total=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.estimated_total = estimated_total
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginate `queryset` by `ordering`, e.g. ('-created_at', '-id').
+
+    The last ordering field must be unique (normally the primary key) so
+    every row has a distinct key. Annotated fields may be used as well.
+    """
+
+    SALT = 'inventory.pagination.keyset'
+
+    def __init__(self, queryset, ordering, per_page, estimate_total=False):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        self.estimate_total = estimate_total
+
+    def get_page(self, cursor=None) -> KeysetPage:
+        key, backwards = self._decode(cursor)
+
+        ordering = self._reversed(self.ordering) if backwards else self.ordering
+        queryset = self.queryset.order_by(*ordering)
+        if key is not None:
+            queryset = queryset.filter(self._after(ordering, key))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, key is not None
+
+        return KeysetPage(
+            rows,
+            next_cursor=self._encode(rows[-1], False) if rows and has_next else None,
+            previous_cursor=self._encode(rows[0], True) if rows and has_previous else None,
+            estimated_total=self._estimate_total() if self.estimate_total else None,
+        )
+
+    @staticmethod
+    def _reversed(ordering):
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+    @staticmethod
+    def _after(ordering, key):
+        """
+        Rows strictly after `key` in `ordering`:
+        (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+        """
+        condition = Q()
+        equal = {}
+        for field, value in zip(ordering, key):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def _encode(self, obj, backwards):
+        key = [getattr(obj, field.lstrip('-')) for field in self.ordering]
+        return signing.dumps(
+            {'k': key, 'b': backwards},
+            salt=self.SALT,
+            serializer=_CursorSerializer,
+            compress=True,
+        )
+
+    def _decode(self, cursor):
+        """Invalid, tampered or stale cursors fall back to the first page."""
+        if not cursor:
+            return None, False
+        try:
+            data = signing.loads(cursor, salt=self.SALT, serializer=_CursorSerializer)
+            key = data['k']
+        except (signing.BadSignature, KeyError, TypeError, ValueError):
+            return None, False
+        if not isinstance(key, list) or len(key) != len(self.ordering):
+            return None, False
+        return key, bool(data.get('b'))
+
+    def _estimate_total(self):
+        """
+        Planner row estimate instead of COUNT(*). Only PostgreSQL exposes
+        one cheaply; other backends return None.
+        """
+        if connection.vendor != 'postgresql':
+            return None
+        try:
+            plan = json.loads(self.queryset.order_by().explain(format='json'))
+            return int(plan[0]['Plan']['Plan Rows'])
+        except (ValueError, KeyError, IndexError, TypeError):
+            return None
@@ -0,0 +1,119 @@
+"""
+Parallel HTML -> PDF rendering for long reports.
+
+xhtml2pdf gets slower than linearly as a table grows, so ReportService
+renders long reports as chunks of rows: each chunk's HTML is rendered to
+PDF in a process pool, the parts are concatenated with pypdf and page
+numbers ("Sahifa N / M") are stamped over the merged document.
+
+This module must not import Django: pool processes are spawned on every
+platform (forking a threaded server or worker process can copy held
+locks and open database connections into the child), import it on their
+own, and only the HTML strings cross the boundary.
+"""
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def render_html(html: str):
+    """PDF bytes for one HTML document, or None if xhtml2pdf failed."""
+    from xhtml2pdf import pisa
+
+    output = BytesIO()
+    pdf = pisa.pisaDocument(BytesIO(html.encode('utf-8')), output)
+    if pdf.err:
+        return None
+    return output.getvalue()
+
+
+def _get_pool(workers):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def render_chunks(html_chunks, workers=None):
+    """
+    Render an iterable of HTML documents in the process pool.
+    Returns their PDF bytes in order, or None if any chunk failed.
+    At most 2 * workers chunks are in flight, so the HTML of a long
+    report is never held in memory all at once.
+    """
+    workers = workers or os.cpu_count() or 1
+    pool = _get_pool(workers)
+    in_flight = 2 * workers
+    futures = deque()
+    parts = []
+    try:
+        for html in html_chunks:
+            futures.append(pool.submit(render_html, html))
+            if len(futures) >= in_flight:
+                parts.append(futures.popleft().result())
+        while futures:
+            parts.append(futures.popleft().result())
+    except BrokenProcessPool:
+        # A worker died (e.g. out of memory); start fresh next time
+        _reset_pool()
+        raise
+    finally:
+        for future in futures:
+            future.cancel()
+    if any(part is None for part in parts):
+        return None
+    return parts
+
+
+def merge(parts, number_pages=True) -> BytesIO:
+    """Concatenate PDF parts; optionally stamp 'Sahifa N / M' on every page."""
+    from pypdf import PdfReader, PdfWriter
+
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(PdfReader(BytesIO(part)))
+
+    if number_pages:
+        total = len(writer.pages)
+        numbers = PdfReader(_page_numbers(writer.pages, total))
+        for page, overlay in zip(writer.pages, numbers.pages):
+            page.merge_page(overlay)
+
+    output = BytesIO()
+    writer.write(output)
+    output.seek(0)
+    return output
+
+
+def _page_numbers(pages, total) -> BytesIO:
+    """One reportlab page per PDF page, each holding only its number."""
+    from reportlab.pdfgen import canvas
+
+    output = BytesIO()
+    c = canvas.Canvas(output)
+    for number, page in enumerate(pages, 1):
+        width, height = float(page.mediabox.width), float(page.mediabox.height)
+        c.setPageSize((width, height))
+        c.setFont('Helvetica', 8)
+        c.setFillGray(0.4)
+        c.drawCentredString(width / 2, 20, f"Sahifa {number} / {total}")
+        c.showPage()
+    c.save()
+    output.seek(0)
+    return output
@@ -0,0 +1,244 @@
+"""
+In-memory barcode/SKU index for the scanner endpoint.
+
+Each worker process keeps a dict from normalized barcode and SKU to a compact
+product record, so a scan is answered without touching the database except
+for the live stock quantity. The index is kept fresh by Product/Category
+signals (incremental update in the writing process) and by the CATALOG
+version stamp (full rebuild in every other process).
+
+The same index keeps a sorted array of name/SKU prefix keys for
+autocomplete: a prefix query is one bisect plus a short scan.
+"""
+import bisect
+import re
+import threading
+from typing import NamedTuple, Optional
+from django.db.models.functions import Trim, Upper
+from .models import Product
+from .versions import CATALOG, bump_version, get_version
+
+
+def normalize_code(value) -> str:
+    """Barcodes and SKUs are matched trimmed and case-insensitively."""
+    return (value or '').strip().upper()
+
+
+def normalized(field: str):
+    """
+    SQL counterpart of normalize_code(). Matches the functional indexes
+    on Product.barcode/sku, unlike `__iexact` which scans the table.
+    """
+    return Upper(Trim(field))
+
+
+def filter_by_code(queryset, field: str, code):
+    """Filter `queryset` on a normalized barcode/SKU using its index."""
+    return queryset.alias(**{f'{field}_norm': normalized(field)}).filter(
+        **{f'{field}_norm': normalize_code(code)}
+    )
+
+
+def normalize_text(value) -> str:
+    """Names are matched case-insensitively with collapsed whitespace."""
+    return ' '.join((value or '').upper().split())
+
+
+def prefix_keys(record) -> list:
+    """
+    Sorted-array entries (key, rank, id) for autocomplete. The whole name
+    and the SKU rank first (0); the name from each later word on ranks
+    second (1), so "pro" also finds "iPhone 15 Pro".
+    """
+    name = normalize_text(record.name)
+    keys = [(name, 0, record.id), (normalize_code(record.sku), 0, record.id)]
+    for match in re.finditer(r'\s(?=\S)', name):
+        keys.append((name[match.end():], 1, record.id))
+    return keys
+
+
+class ProductRecord(NamedTuple):
+    """Compact, immutable product snapshot used by the lookup index."""
+    id: int
+    uid: str
+    name: str
+    sku: str
+    barcode: str
+    unit: str
+    category: str
+    min_stock: int
+
+    @classmethod
+    def from_product(cls, product: Product) -> 'ProductRecord':
+        return cls(
+            product.id,
+            str(product.uid),
+            product.name,
+            product.sku,
+            product.barcode,
+            product.unit,
+            product.category.name,
+            product.min_stock,
+        )
+
+    def as_dict(self, stock_qty: int) -> dict:
+        """JSON payload returned by product_by_barcode."""
+        data = self._asdict()
+        data['stock_qty'] = stock_qty
+        return data
+
+
+class ProductLookupIndex:
+    """Per-process barcode/SKU → ProductRecord index."""
+
+    FIELDS = ('id', 'uid', 'name', 'sku', 'barcode', 'unit', 'category__name', 'min_stock')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._by_id = {}
+        self._by_barcode = {}
+        self._by_sku = {}
+        self._prefixes = []
+
+    def _ensure_fresh(self):
+        version = get_version(CATALOG)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._rebuild(version)
+
+    def _rebuild(self, version):
+        """Load every product in one query and swap the dicts in."""
+        by_id, by_barcode, by_sku, prefixes = {}, {}, {}, []
+        for row in Product.objects.order_by().values_list(*self.FIELDS).iterator(chunk_size=2000):
+            record = ProductRecord(row[0], str(row[1]), *row[2:])
+            by_id[record.id] = record
+            by_barcode[normalize_code(record.barcode)] = record
+            by_sku[normalize_code(record.sku)] = record
+            prefixes.extend(prefix_keys(record))
+        prefixes.sort()
+        self._by_id, self._by_barcode, self._by_sku = by_id, by_barcode, by_sku
+        self._prefixes = prefixes
+        self._version = version
+
+    def _discard(self, product_id):
+        old = self._by_id.pop(product_id, None)
+        if old is not None:
+            self._by_barcode.pop(normalize_code(old.barcode), None)
+            self._by_sku.pop(normalize_code(old.sku), None)
+            # Copy, edit, swap: readers never see a half-updated array
+            prefixes = self._prefixes[:]
+            for key in prefix_keys(old):
+                i = bisect.bisect_left(prefixes, key)
+                if i < len(prefixes) and prefixes[i] == key:
+                    del prefixes[i]
+            self._prefixes = prefixes
+
+    def _add(self, record):
+        self._by_id[record.id] = record
+        self._by_barcode[normalize_code(record.barcode)] = record
+        self._by_sku[normalize_code(record.sku)] = record
+        prefixes = self._prefixes[:]
+        for key in prefix_keys(record):
+            bisect.insort(prefixes, key)
+        self._prefixes = prefixes
+
+    def _apply(self, new_version, change):
+        """
+        Apply `change` locally if this process's own bump took the stamp
+        from the version it is built from to `new_version`; any other
+        value means another process changed the catalog too, and the
+        next lookup must rebuild.
+        """
+        with self._lock:
+            if self._version is not None and new_version == self._version + 1:
+                change()
+                self._version = new_version
+            else:
+                self._version = None
+
+    def lookup(self, code) -> Optional[ProductRecord]:
+        """Resolve a scanned code, barcode first, then SKU."""
+        self._ensure_fresh()
+        code = normalize_code(code)
+        return self._by_barcode.get(code) or self._by_sku.get(code)
+
+    def autocomplete(self, text, limit=10) -> list:
+        """
+        Products whose name, SKU or a word of the name starts with `text`:
+        whole-name/SKU matches first, then by name.
+        """
+        self._ensure_fresh()
+        prefix = normalize_text(text)
+        if not prefix:
+            return []
+
+        prefixes = self._prefixes
+        best = {}
+        # Scan a bounded window so one-letter prefixes stay cheap
+        i = bisect.bisect_left(prefixes, (prefix,))
+        for key, rank, product_id in prefixes[i:i + limit * 20]:
+            if not key.startswith(prefix):
+                break
+            if rank < best.get(product_id, 2):
+                best[product_id] = rank
+
+        records = [(rank, self._by_id.get(product_id)) for product_id, rank in best.items()]
+        records = sorted(
+            (item for item in records if item[1] is not None),
+            key=lambda item: (item[0], item[1].name.upper(), item[1].id)
+        )
+        return [record for _, record in records[:limit]]
+
+    def resolve_many(self, codes) -> dict:
+        """
+        Resolve a burst of scanned codes: {code: ProductRecord or None}.
+
+        Index misses cost one IN query on normalized barcode and one on
+        normalized SKU, whatever the number of codes.
+        """
+        self._ensure_fresh()
+        results = {}
+        missing = {}
+        for code in codes:
+            norm = normalize_code(code)
+            record = self._by_barcode.get(norm) or self._by_sku.get(norm)
+            results[code] = record
+            if record is None and norm:
+                missing.setdefault(norm, []).append(code)
+
+        for field in ('barcode', 'sku'):
+            if not missing:
+                break
+            found = (
+                Product.objects.select_related('category')
+                .alias(code_norm=normalized(field))
+                .filter(code_norm__in=list(missing))
+            )
+            for product in found:
+                for code in missing.pop(normalize_code(getattr(product, field)), []):
+                    results[code] = ProductRecord.from_product(product)
+
+        return results
+
+    def product_saved(self, product: Product):
+        record = ProductRecord.from_product(product)
+
+        def change():
+            self._discard(record.id)
+            self._add(record)
+
+        self._apply(bump_version(CATALOG), change)
+
+    def product_deleted(self, product_id: int):
+        self._apply(bump_version(CATALOG), lambda: self._discard(product_id))
+
+    def invalidate(self):
+        """Force every process (this one included) to rebuild."""
+        bump_version(CATALOG)
+        with self._lock:
+            self._version = None
+
+
+product_index = ProductLookupIndex()
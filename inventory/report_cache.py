@@ -0,0 +1,125 @@
+"""
+Disk cache of rendered reports.
+
+A report is keyed by (type, format, normalized parameters, data versions):
+the stock report depends on the CATALOG and STOCK stamps, the movement
+report on CATALOG, MOVEMENTS and EMPLOYEES, the low-stock forecast and the
+analytics on CATALOG, STOCK and MOVEMENTS. The reports that read daily
+rollups also depend on ROLLUPS, bumped when rollups are rebuilt. Any stock
+or movement change bumps a stamp, so stale files are never served; they
+just age out.
+
+Files live in REPORT_CACHE_DIR next to a small JSON sidecar (download name,
+content type). A hit touches the file, and the oldest files are evicted
+once the directory grows past REPORT_CACHE_MAX_BYTES (LRU by mtime).
+"""
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from django.conf import settings
+from .versions import CATALOG, EMPLOYEES, MOVEMENTS, ROLLUPS, STOCK, get_version
+
+REPORT_VERSIONS = {
+    'stock': (CATALOG, STOCK),
+    'low_stock': (CATALOG, STOCK, MOVEMENTS, ROLLUPS),
+    'movement': (CATALOG, MOVEMENTS, EMPLOYEES, ROLLUPS),
+    'analytics': (CATALOG, STOCK, MOVEMENTS, ROLLUPS),
+}
+
+
+class ReportCache:
+    """Size-bounded LRU of report files."""
+
+    @staticmethod
+    def directory() -> str:
+        path = str(settings.REPORT_CACHE_DIR)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    @staticmethod
+    def key(report_type, fmt, params) -> str:
+        versions = [get_version(name) for name in REPORT_VERSIONS.get(report_type, ())]
+        payload = json.dumps([report_type, fmt, params, versions], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _paths(key):
+        base = os.path.join(ReportCache.directory(), key)
+        return base + '.bin', base + '.json'
+
+    @staticmethod
+    def get(key):
+        """(path, filename, content_type) for a cached report, or None."""
+        path, meta_path = ReportCache._paths(key)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            os.utime(path)  # most recently used
+        except (OSError, ValueError):
+            return None
+        return path, meta['filename'], meta['content_type']
+
+    @staticmethod
+    def put(key, content, filename, content_type) -> str:
+        """Store a rendered file object; returns the cached file's path."""
+        path, meta_path = ReportCache._paths(key)
+        part = f'{path}.{uuid.uuid4().hex}.part'
+        try:
+            with content, open(part, 'wb') as output:
+                shutil.copyfileobj(content, output)
+            ReportCache._commit(part, path, meta_path, filename, content_type)
+        finally:
+            if os.path.exists(part):
+                os.remove(part)
+        return path
+
+    @staticmethod
+    def tee(key, chunks, filename, content_type):
+        """
+        Pass streamed chunks (CSV) through while writing them to the cache.
+        The file is only kept if the stream is consumed to the end.
+        """
+        path, meta_path = ReportCache._paths(key)
+        part = f'{path}.{uuid.uuid4().hex}.part'
+        try:
+            with open(part, 'wb') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+                    yield chunk
+            ReportCache._commit(part, path, meta_path, filename, content_type)
+        finally:
+            if os.path.exists(part):
+                os.remove(part)
+
+    @staticmethod
+    def _commit(part, path, meta_path, filename, content_type):
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump({'filename': filename, 'content_type': content_type}, f)
+        os.replace(part, path)
+        ReportCache.evict()
+
+    @staticmethod
+    def evict(max_bytes=None) -> int:
+        """Delete least recently used reports until the cache fits; returns bytes freed."""
+        max_bytes = settings.REPORT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        entries = []
+        with os.scandir(ReportCache.directory()) as it:
+            for entry in it:
+                if entry.name.endswith('.bin'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in sorted(entries):
+            if total - freed <= max_bytes:
+                break
+            for victim in (path, path[:-len('.bin')] + '.json'):
+                try:
+                    os.remove(victim)
+                except FileNotFoundError:
+                    pass
+            freed += size
+        return freed
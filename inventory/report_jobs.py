@@ -0,0 +1,182 @@
+"""
+Background report jobs.
+
+The report views queue a ReportJob; `manage.py run_report_worker` claims
+pending jobs, renders them with ReportService.render_cached() into
+MEDIA_ROOT/reports/ and marks them DONE or FAILED. The client polls the
+job and downloads the artifact until it expires (REPORT_JOB_TTL).
+
+Claiming is a conditional UPDATE (PENDING -> RUNNING), so several
+workers can share the queue without locking.
+
+Workers record a heartbeat in the cache on every loop. A pending job with
+no live worker is reported as such to the polling client, and fails once
+it is older than REPORT_JOB_TIMEOUT so that it can be queued again.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .models import ReportJob
+from .reports import ReportService
+
+IN_FLIGHT = ('PENDING', 'RUNNING')
+REPORTS_DIR = 'reports'
+
+WORKER_HEARTBEAT_KEY = 'inventory:report_worker:heartbeat'
+# A worker silent for longer than this (seconds) and not rendering is gone
+WORKER_HEARTBEAT_TIMEOUT = 60
+
+
+class ReportJobService:
+    """Queue, run and expire ReportJob rows."""
+
+    @staticmethod
+    def params_hash(report_type, fmt, params) -> str:
+        payload = json.dumps([report_type, fmt, params], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def enqueue(user, report_type, fmt, params) -> ReportJob:
+        """
+        Queue a report; params must come from ReportService.normalize_params().
+        Returns the identical job instead when one is pending or running.
+        """
+        # A job stuck in flight would otherwise block its parameters for good
+        ReportJobService.fail_stale()
+        params_hash = ReportJobService.params_hash(report_type, fmt, params)
+        in_flight = ReportJob.objects.filter(params_hash=params_hash, status__in=IN_FLIGHT)
+        job = in_flight.first()
+        if job:
+            return job
+        try:
+            with transaction.atomic():
+                return ReportJob.objects.create(
+                    report_type=report_type,
+                    format=fmt,
+                    params=params,
+                    params_hash=params_hash,
+                    requested_by=user,
+                )
+        except IntegrityError:
+            # Queued concurrently by another request
+            job = in_flight.first()
+            if job is None:
+                raise
+            return job
+
+    @staticmethod
+    def claim_next():
+        """Oldest pending job, now RUNNING and owned by the caller, or None."""
+        pending = (
+            ReportJob.objects.filter(status='PENDING')
+            .order_by('created_at')
+            .values_list('pk', flat=True)[:10]
+        )
+        for job_id in pending:
+            claimed = ReportJob.objects.filter(pk=job_id, status='PENDING').update(
+                status='RUNNING', started_at=timezone.now()
+            )
+            if claimed:
+                return ReportJob.objects.get(pk=job_id)
+        return None
+
+    @staticmethod
+    def run(job: ReportJob) -> ReportJob:
+        """Render a claimed job to MEDIA_ROOT/reports/ and record the result."""
+        reports_dir = os.path.join(settings.MEDIA_ROOT, REPORTS_DIR)
+        os.makedirs(reports_dir, exist_ok=True)
+        path = None
+        try:
+            content, filename, content_type = ReportService.render_cached(job.report_type, job.format, job.params)
+            name = f"{uuid.uuid4().hex}{os.path.splitext(filename)[1]}"
+            path = os.path.join(reports_dir, name)
+            # Written under a temporary name: a half-written file is never served
+            with open(path + '.part', 'wb') as output:
+                if hasattr(content, 'read'):
+                    with content:
+                        shutil.copyfileobj(content, output)
+                else:
+                    for chunk in content:
+                        output.write(chunk)
+            os.replace(path + '.part', path)
+        except Exception as exc:
+            if path and os.path.exists(path + '.part'):
+                os.remove(path + '.part')
+            job.status = 'FAILED'
+            job.error = str(exc) or exc.__class__.__name__
+            job.finished_at = timezone.now()
+            job.save(update_fields=['status', 'error', 'finished_at'])
+            return job
+
+        now = timezone.now()
+        job.status = 'DONE'
+        job.file = os.path.join(REPORTS_DIR, name)
+        job.filename = filename
+        job.content_type = content_type
+        job.finished_at = now
+        job.expires_at = now + timedelta(seconds=settings.REPORT_JOB_TTL)
+        job.save(update_fields=['status', 'file', 'filename', 'content_type', 'finished_at', 'expires_at'])
+        return job
+
+    @staticmethod
+    def artifact_path(job: ReportJob):
+        """Absolute path of a DONE job's file, or None if missing or expired."""
+        if job.status != 'DONE' or not job.file:
+            return None
+        if job.expires_at and job.expires_at <= timezone.now():
+            return None
+        path = os.path.join(settings.MEDIA_ROOT, job.file)
+        return path if os.path.exists(path) else None
+
+    @staticmethod
+    def heartbeat():
+        """Called by run_report_worker on every loop."""
+        cache.set(WORKER_HEARTBEAT_KEY, time.time(), None)
+
+    @staticmethod
+    def worker_available() -> bool:
+        """True if a worker beat recently or is rendering a job right now."""
+        beat = cache.get(WORKER_HEARTBEAT_KEY)
+        if beat is not None and time.time() - beat < WORKER_HEARTBEAT_TIMEOUT:
+            return True
+        cutoff = timezone.now() - timedelta(seconds=settings.REPORT_JOB_TIMEOUT)
+        return ReportJob.objects.filter(status='RUNNING', started_at__gte=cutoff).exists()
+
+    @staticmethod
+    def fail_stale() -> int:
+        """
+        Fail jobs older than REPORT_JOB_TIMEOUT: RUNNING ones whose worker
+        died and PENDING ones no worker picked up.
+        """
+        now = timezone.now()
+        cutoff = now - timedelta(seconds=settings.REPORT_JOB_TIMEOUT)
+        running = ReportJob.objects.filter(status='RUNNING', started_at__lt=cutoff).update(
+            status='FAILED', error="Vaqt tugadi", finished_at=now
+        )
+        pending = ReportJob.objects.filter(status='PENDING', created_at__lt=cutoff).update(
+            status='FAILED', error="Hisobot worker ishlamayapti", finished_at=now
+        )
+        return running + pending
+
+    @staticmethod
+    def purge_expired() -> int:
+        """Delete expired artifacts and finished jobs older than REPORT_JOB_TTL."""
+        now = timezone.now()
+        expired = ReportJob.objects.filter(status='DONE', expires_at__lte=now)
+        for file in expired.exclude(file='').values_list('file', flat=True):
+            path = os.path.join(settings.MEDIA_ROOT, file)
+            if os.path.exists(path):
+                os.remove(path)
+        count, _ = expired.delete()
+        failed, _ = ReportJob.objects.filter(
+            status='FAILED', finished_at__lte=now - timedelta(seconds=settings.REPORT_JOB_TTL)
+        ).delete()
+        return count + failed
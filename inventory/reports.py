@@ -1,152 +1,604 @@
+import tempfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import chain, islice
+from typing import NamedTuple, Optional
 import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from openpyxl.styles import Font, Alignment, NamedStyle, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
-from openpyxl.cell.cell import MergedCell
+from openpyxl.cell import WriteOnlyCell
 from io import BytesIO
-from django.db.models import Sum, F
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, CharField, F, Value, When
+from django.db.models.functions import Coalesce
 from django.template.loader import get_template
 from django.utils import timezone
-from xhtml2pdf import pisa
-from .models import Movement, Stock, Product
+from . import pdf_worker
+from .aggregates import LocalDateTime
+from .analytics import ANALYTICS_PERIODS, DEFAULT_ANALYTICS_DAYS, AnalyticsService
+from .exports import CsvExport
+from .report_cache import ReportCache
+from .models import Movement, MovementItem, ReportJob, Stock, Product
+from .rollups import RollupService
+
+EXCEL_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+
+
+class ReportError(Exception):
+    """Report parameters are invalid or rendering failed (message is user-facing)."""
+
+
+STOCK_ROW_COLUMNS = (
+    'product__sku', 'product__name', 'product__category__name',
+    'product__unit', 'current_qty', 'product__min_stock',
+)
+
+
+class StockRow(NamedTuple):
+    """One line of the stock report."""
+    sku: str
+    name: str
+    category: str
+    unit: str
+    current_qty: int
+    min_stock: int
+
+    @property
+    def is_low(self) -> bool:
+        return self.current_qty <= self.min_stock
+
+
+class LowStockRow(NamedTuple):
+    """One line of the low-stock report, with its consumption forecast."""
+    sku: str
+    name: str
+    category: str
+    unit: str
+    current_qty: int
+    min_stock: int
+    daily_use: Optional[float]
+    reorder_point: int
+    stockout_date: Optional[date]
+
+    @property
+    def deficit(self) -> int:
+        return self.reorder_point - self.current_qty
+
+
+LOW_STOCK_COLUMNS = [
+    'SKU', 'Nomi', 'Kategoriya', 'Hozirgi Soni', 'Min Soni', 'Kunlik Sarf',
+    'Buyurtma Nuqtasi', 'Tugash Sanasi', 'Yetishmayotgan',
+]
+
+
+def low_stock_cells(row: LowStockRow) -> list:
+    """Excel/CSV cells of a low-stock row, in LOW_STOCK_COLUMNS order."""
+    return [
+        row.sku, row.name, row.category, row.current_qty, row.min_stock, row.daily_use,
+        row.reorder_point, row.stockout_date, row.deficit,
+    ]
+
+
+class MovementRow(NamedTuple):
+    """One movement of the movement report, items already summarised."""
+    id: int
+    movement_type: str
+    type_label: str
+    created_at: datetime
+    username: str
+    employee: str
+    items: str
+    note: str
+    quantity: int
+    value: Decimal
+
+
+class RunningTotals:
+    """Totals counted while report rows stream past; final after the last row."""
+    __slots__ = ('count', 'quantity', 'value')
+
+    def __init__(self):
+        self.count = 0
+        self.quantity = 0
+        self.value = Decimal('0')
+
 
 class ReportService:
+    # Rows looked at to size the columns; a write-only sheet needs its
+    # widths before the first row is written
+    WIDTH_SAMPLE_ROWS = 1000
+
+    @staticmethod
+    def _excel_styles(wb):
+        """Register the report's named styles once per workbook."""
+        thin = Side(style='thin')
+        border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        center = Alignment(horizontal="center", vertical="center")
+        styles = [
+            NamedStyle(name='report_title', font=Font(size=14, bold=True), alignment=center),
+            NamedStyle(
+                name='report_header',
+                font=Font(bold=True, color="FFFFFF"),
+                fill=PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid"),
+                alignment=center,
+                border=border,
+            ),
+            NamedStyle(name='report_cell', border=border),
+            NamedStyle(name='report_cell_wrap', border=border, alignment=Alignment(wrap_text=True)),
+        ]
+        for style in styles:
+            wb.add_named_style(style)
+
     @staticmethod
     def generate_excel(data, headers, sheet_name="Report", title="Hisobot"):
         """
         Generates a professional Excel file.
-        data: List of lists/tuples
+        data: Iterable of lists/tuples (a generator is fine, rows are
+              written as they come)
         headers: List of strings
+
+        Returns a rewound temporary file; pass it to FileResponse, which
+        streams it and closes it.
         """
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = sheet_name
+        wb = openpyxl.Workbook(write_only=True)
+        ReportService._excel_styles(wb)
+        ws = wb.create_sheet(sheet_name)
+
+        rows = iter(data)
+        sample = list(islice(rows, ReportService.WIDTH_SAMPLE_ROWS))
 
-        # Styles
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-        center_align = Alignment(horizontal="center", vertical="center")
-        thin_border = Border(left=Side(style='thin'), right=Side(style='thin'),
-                             top=Side(style='thin'), bottom=Side(style='thin'))
+        # Auto-adjust column width from the header and the sampled rows
+        widths = [len(str(header)) for header in headers]
+        for row_data in sample:
+            for col_idx, value in enumerate(row_data):
+                if value is not None:
+                    widths[col_idx] = max(widths[col_idx], len(str(value)))
+        for col_idx, width in enumerate(widths, 1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = min(max(width + 2, 10), 50)
 
         # Title Row
-        ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=len(headers))
-        title_cell = ws.cell(row=1, column=1, value=title)
-        title_cell.font = Font(size=14, bold=True)
-        title_cell.alignment = center_align
+        ws.merged_cells.add(f"A1:{get_column_letter(len(headers))}1")
+        ws.append([ReportService._excel_cell(ws, title, 'report_title')])
 
         # Header Row
-        ws.append(headers)
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=2, column=col_num)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = center_align
-            cell.border = thin_border
-
-        # Data Rows
-        for row_data in data:
-            ws.append(row_data)
-            # Apply border to current row
-            current_row = ws.max_row
-            for col_num in range(1, len(headers) + 1):
-                cell = ws.cell(row=current_row, column=col_num)
-                cell.border = thin_border
-                # Wrap text for longer fields if needed
-                if isinstance(row_data[col_num-1], str) and len(row_data[col_num-1]) > 50:
-                    cell.alignment = Alignment(wrap_text=True)
-
-        # Auto-adjust column width (skip merged cells)
-        for col_idx in range(1, len(headers) + 1):
-            max_length = 0
-            column_letter = get_column_letter(col_idx)
-            for row_idx in range(2, ws.max_row + 1):  # Start from row 2 (skip merged title)
-                cell = ws.cell(row=row_idx, column=col_idx)
-                if isinstance(cell, MergedCell):
-                    continue
-                try:
-                    if cell.value and len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = max(max_length + 2, 10)
-            ws.column_dimensions[column_letter].width = min(adjusted_width, 50)
-
-        output = BytesIO()
+        ws.append([ReportService._excel_cell(ws, header, 'report_header') for header in headers])
+
+        # Data Rows. Write-only rows are serialised on append, so one styled
+        # cell per column is refilled instead of styling a new cell each time
+        plain = [ReportService._excel_cell(ws, None, 'report_cell') for _ in headers]
+        wrapped = [ReportService._excel_cell(ws, None, 'report_cell_wrap') for _ in headers]
+        for row_data in chain(sample, rows):
+            row = []
+            for col_idx, value in enumerate(row_data):
+                # Wrap text for longer fields
+                cell = wrapped[col_idx] if isinstance(value, str) and len(value) > 50 else plain[col_idx]
+                cell.value = value
+                row.append(cell)
+            ws.append(row)
+
+        output = tempfile.TemporaryFile()
         wb.save(output)
         output.seek(0)
         return output
 
     @staticmethod
-    def generate_pdf(template_src, context):
+    def _excel_cell(ws, value, style):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+
+    @staticmethod
+    def generate_pdf(template_src, context, rows_key=None):
         """
         Generates a PDF from a Django template.
+
+        With rows_key, context[rows_key] (any iterable) is split into chunks
+        of PDF_CHUNK_ROWS rows, rendered in parallel by pdf_worker and
+        merged with page numbers. Each chunk is a full document; the
+        template gets `first_chunk` / `last_chunk` to print its header and
+        totals only once.
         """
         template = get_template(template_src)
-        html = template.render(context)
-        result = BytesIO()
-        pdf = pisa.pisaDocument(BytesIO(html.encode("utf-8")), result)
-        if not pdf.err:
-            result.seek(0)
-            return result
-        return None
+        if rows_key is None:
+            return ReportService._render_pdf_html(template.render({**context, 'first_chunk': True, 'last_chunk': True}))
+
+        chunk_size = settings.PDF_CHUNK_ROWS
+        rows = iter(context[rows_key])
+        chunks = iter(lambda: list(islice(rows, chunk_size)), [])
+        first = next(chunks, [])
+        second = next(chunks, None)
+        if second is None:
+            # Short report: one document, no pool
+            return ReportService._render_pdf_html(
+                template.render({**context, rows_key: first, 'first_chunk': True, 'last_chunk': True})
+            )
+
+        def html_chunks():
+            current, index = first, 0
+            for upcoming in chain([second], chunks, [None]):
+                yield template.render({
+                    **context,
+                    rows_key: current,
+                    'first_chunk': index == 0,
+                    'last_chunk': upcoming is None,
+                })
+                current, index = upcoming, index + 1
+
+        parts = pdf_worker.render_chunks(html_chunks(), settings.PDF_WORKERS)
+        if parts is None:
+            return None
+        return pdf_worker.merge(parts)
+
+    @staticmethod
+    def _render_pdf_html(html):
+        pdf = pdf_worker.render_html(html)
+        return BytesIO(pdf) if pdf is not None else None
+
+    # Report data builders: one query each, rows are lightweight tuples
+    # streamed once into either the Excel or the PDF renderer, and the
+    # totals are counted on the way
 
     @staticmethod
     def get_stock_report_data():
         """
-        Returns data for Stock Report (Excel/PDF context).
-        """
-        stocks = Stock.objects.select_related('product', 'product__category').order_by('product__category__name', 'product__name')
-        
-        # Excel Data
-        excel_data = []
-        for s in stocks:
-            excel_data.append([
-                s.product.sku,
-                s.product.name,
-                s.product.category.name,
-                s.product.unit,
-                s.current_qty,
-                s.product.min_stock,
-                "⚠️ KAM" if s.current_qty <= s.product.min_stock else "OK"
-            ])
-            
-        # Context for PDF
-        return {
-            'excel_data': excel_data,
-            'stocks': stocks,
-            'total_items': stocks.count(),
-            'total_qty': stocks.aggregate(Sum('current_qty'))['current_qty__sum'] or 0
-        }
+        Returns data for Stock Report: {'rows': StockRow generator, 'totals'}.
+        """
+        totals = RunningTotals()
+        stocks = Stock.objects.order_by('product__category__name', 'product__name').values_list(*STOCK_ROW_COLUMNS)
+
+        def rows():
+            for values in stocks.iterator(chunk_size=2000):
+                row = StockRow._make(values)
+                totals.count += 1
+                totals.quantity += row.current_qty
+                yield row
+
+        return {'rows': rows(), 'totals': totals}
 
     @staticmethod
     def get_movement_report_data(start_date, end_date, movement_type=None):
         """
-        Returns data for Movement Report.
+        Returns data for Movement Report: {'rows': MovementRow generator,
+        'totals', 'summary', 'start_date', 'end_date'}.
         """
         movements = Movement.objects.filter(
             created_at__range=[start_date, end_date],
             status='VERIFIED'
-        ).select_related('performed_by', 'face_employee').prefetch_related('items__product')
+        )
 
         if movement_type and movement_type != 'ALL':
             movements = movements.filter(movement_type=movement_type)
 
-        excel_data = []
-        for m in movements:
-            items_str = ", ".join([f"{item.product.name} ({item.quantity})" for item in m.items.all()])
-            excel_data.append([
-                m.id,
-                m.get_movement_type_display(),
-                m.created_at.strftime("%Y-%m-%d %H:%M"),
-                m.performed_by.username,
-                m.face_employee.name if m.face_employee else "-",
-                items_str,
-                m.note
-            ])
+        # One flat query: item summary and totals are aggregated by the
+        # database (string_agg / group_concat), no items are loaded
+        movements = (
+            movements.with_totals().with_summary()
+            .order_by('created_at', 'id')
+            .values_list(
+                'id',
+                'movement_type',
+                'created_at',
+                'performed_by__username',
+                Coalesce('face_employee__name', Value('-')),
+                'items_summary',
+                'note',
+                'quantity_sum',
+                'value_sum',
+            )
+        )
+        type_labels = dict(Movement.MOVEMENT_TYPES)
+        totals = RunningTotals()
+
+        def rows():
+            for pk, m_type, created_at, username, employee, items, note, quantity, value in movements.iterator(chunk_size=2000):
+                totals.count += 1
+                totals.quantity += quantity
+                totals.value += value
+                yield MovementRow(
+                    pk, m_type, type_labels.get(m_type, m_type), created_at,
+                    username, employee, items or '', note, quantity, value
+                )
+
+        # Per-product totals come from the daily rollups, not the items
+        summary = RollupService.product_totals(start_date.date(), end_date.date(), movement_type)
 
         return {
-            'excel_data': excel_data,
-            'movements': movements,
+            'rows': rows(),
+            'totals': totals,
+            'summary': summary,
             'start_date': start_date,
             'end_date': end_date
         }
+
+    @staticmethod
+    def get_low_stock_report_data(end_date=None):
+        """
+        Returns data for Low Stock Report: {'rows': LowStockRow generator, 'totals'}.
+        Rows come from the consumption forecast (AnalyticsService.reorder_list).
+        """
+        totals = RunningTotals()
+        due = AnalyticsService.reorder_list(end_date or timezone.localdate())
+
+        def rows():
+            for values in due:
+                row = LowStockRow._make(values)
+                totals.count += 1
+                totals.quantity += row.deficit
+                yield row
+
+        return {'rows': rows(), 'totals': totals}
+
+    # CSV exports: flat values_list() querysets that CsvExport can stream
+    # (or hand to PostgreSQL COPY), one row per stock line / movement item.
+    # The low-stock CSV is the forecast list itself (LOW_STOCK_COLUMNS).
+
+    @staticmethod
+    def get_stock_csv_query():
+        return (
+            Stock.objects.order_by('product__category__name', 'product__name')
+            .values_list(
+                'product__sku',
+                'product__name',
+                'product__category__name',
+                'product__unit',
+                'current_qty',
+                'product__min_stock',
+                Case(
+                    When(current_qty__lte=F('product__min_stock'), then=Value('KAM')),
+                    default=Value('OK'),
+                    output_field=CharField(),
+                ),
+            )
+        )
+
+    @staticmethod
+    def get_movement_csv_query(start_date, end_date, movement_type=None):
+        items = MovementItem.objects.filter(
+            movement__created_at__range=[start_date, end_date],
+            movement__status='VERIFIED'
+        )
+        if movement_type and movement_type != 'ALL':
+            items = items.filter(movement__movement_type=movement_type)
+
+        type_label = Case(
+            *[When(movement__movement_type=code, then=Value(str(label))) for code, label in Movement.MOVEMENT_TYPES],
+            default=F('movement__movement_type'),
+            output_field=CharField(),
+        )
+        # Local time: formatted by the database for COPY, else by CsvExport
+        created_at = F('movement__created_at')
+        if connections[items.db].vendor == 'postgresql':
+            created_at = LocalDateTime(created_at)
+        # Every column is an expression: SQL puts plain fields before
+        # expressions, and COPY writes the columns in SELECT order
+        return (
+            items.order_by('movement__created_at', 'movement_id', 'id')
+            .values_list(
+                F('movement_id'),
+                type_label,
+                created_at,
+                F('movement__performed_by__username'),
+                Coalesce('movement__face_employee__name', Value('-')),
+                F('product__sku'),
+                F('product__name'),
+                F('quantity'),
+                F('unit_price'),
+                F('movement__note'),
+            )
+        )
+
+    # ------------------------------------------------------------------
+    # Rendering: shared by the download views and the report worker
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def normalize_params(report_type, params) -> dict:
+        """
+        Validated, canonical parameters for a report (defaults filled in),
+        so identical requests hash the same. Raises ReportError.
+        """
+        if report_type not in dict(ReportJob.REPORT_TYPES):
+            raise ReportError("Noma'lum hisobot turi")
+        today = timezone.localdate()
+        if report_type == 'analytics':
+            try:
+                days = int(params.get('days') or DEFAULT_ANALYTICS_DAYS)
+            except ValueError:
+                raise ReportError("Noto'g'ri davr")
+            if days not in ANALYTICS_PERIODS:
+                raise ReportError("Noto'g'ri davr")
+            # Always up to today: the period is traced back from current stock
+            return {
+                'days': days,
+                'start_date': (today - timedelta(days=days - 1)).isoformat(),
+                'end_date': today.isoformat(),
+            }
+        if report_type == 'low_stock':
+            # The forecast moves with the calendar, not only with the data
+            return {'date': today.isoformat()}
+        if report_type != 'movement':
+            return {}
+
+        try:
+            start_date = datetime.strptime(params['start_date'], '%Y-%m-%d').date() if params.get('start_date') else today.replace(day=1)
+            end_date = datetime.strptime(params['end_date'], '%Y-%m-%d').date() if params.get('end_date') else today
+        except ValueError:
+            raise ReportError("Noto'g'ri sana formati")
+
+        movement_type = params.get('type') or 'ALL'
+        if movement_type not in ('IN', 'OUT'):
+            movement_type = 'ALL'
+        return {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'type': movement_type,
+        }
+
+    @staticmethod
+    def render(report_type, fmt, params):
+        """
+        Build a report from normalize_params() output.
+        Returns (content, filename, content_type); content is a file object,
+        or an iterator of byte chunks for CSV. Raises ReportError.
+        """
+        renderers = {
+            'stock': ReportService._render_stock,
+            'movement': ReportService._render_movement,
+            'low_stock': ReportService._render_low_stock,
+            'analytics': ReportService._render_analytics,
+        }
+        if report_type not in renderers or fmt not in dict(ReportJob.FORMATS):
+            raise ReportError("Noma'lum hisobot turi")
+        return renderers[report_type](fmt, params)
+
+    @staticmethod
+    def render_cached(report_type, fmt, params):
+        """
+        render() through ReportCache. A hit is an open file from the cache;
+        a miss renders, stores the file (CSV is cached as it streams) and
+        returns it the same way as render().
+        """
+        key = ReportCache.key(report_type, fmt, params)
+        cached = ReportCache.get(key)
+        if cached:
+            path, filename, content_type = cached
+            return open(path, 'rb'), filename, content_type
+
+        content, filename, content_type = ReportService.render(report_type, fmt, params)
+        if hasattr(content, 'read'):
+            path = ReportCache.put(key, content, filename, content_type)
+            return open(path, 'rb'), filename, content_type
+        return ReportCache.tee(key, content, filename, content_type), filename, content_type
+
+    @staticmethod
+    def _pdf(template_src, context, rows_key=None):
+        output = ReportService.generate_pdf(template_src, context, rows_key)
+        if output is None:
+            raise ReportError("PDF yaratishda xatolik")
+        return output
+
+    @staticmethod
+    def _render_stock(fmt, params):
+        headers = ['SKU', 'Nomi', 'Kategoriya', 'O\'lchov', 'Hozirgi Soni', 'Min Soni', 'Holat']
+        if fmt == 'csv':
+            rows = CsvExport.stream(ReportService.get_stock_csv_query(), headers)
+            return rows, 'stock_report.csv', CSV_CONTENT_TYPE
+
+        data = ReportService.get_stock_report_data()
+        if fmt == 'pdf':
+            context = {
+                'rows': data['rows'],
+                'totals': data['totals'],
+                'generated_at': timezone.now(),
+                'title': 'Ombor Qoldig\'i Hisoboti'
+            }
+            return ReportService._pdf('inventory/reports/stock_pdf.html', context, 'rows'), 'stock_report.pdf', 'application/pdf'
+
+        excel_data = (
+            [*row, "⚠️ KAM" if row.is_low else "OK"]
+            for row in data['rows']
+        )
+        output = ReportService.generate_excel(
+            excel_data, headers,
+            sheet_name="Ombor", title="Ombor Qoldig'i Hisoboti"
+        )
+        return output, 'stock_report.xlsx', EXCEL_CONTENT_TYPE
+
+    @staticmethod
+    def _render_movement(fmt, params):
+        movement_type = params['type']
+        start_date = datetime.strptime(params['start_date'], '%Y-%m-%d')
+        # Set end_date to end of day
+        end_date = datetime.strptime(params['end_date'], '%Y-%m-%d').replace(hour=23, minute=59, second=59)
+        name = movement_type.lower()
+
+        if fmt == 'csv':
+            # One line per movement item
+            headers = ['ID', 'Turi', 'Sana', 'Foydalanuvchi', 'Xodim (Face ID)', 'SKU', 'Mahsulot', 'Miqdor', 'Narx', 'Izoh']
+            rows = CsvExport.stream(
+                ReportService.get_movement_csv_query(start_date, end_date, movement_type), headers
+            )
+            return rows, f'{name}_report.csv', CSV_CONTENT_TYPE
+
+        data = ReportService.get_movement_report_data(start_date, end_date, movement_type)
+        type_label = {'IN': 'Kirim', 'OUT': 'Chiqim', 'ALL': 'Barcha'}.get(movement_type, 'Barcha')
+        title = f"{type_label} Hisoboti ({start_date.strftime('%d.%m.%Y')} - {end_date.strftime('%d.%m.%Y')})"
+
+        if fmt == 'pdf':
+            context = {
+                'rows': data['rows'],
+                'totals': data['totals'],
+                'summary': data['summary'],
+                'start_date': data['start_date'],
+                'end_date': data['end_date'],
+                'generated_at': timezone.now(),
+                'title': title,
+                'type_label': type_label
+            }
+            return ReportService._pdf('inventory/reports/movement_pdf.html', context, 'rows'), f'{name}_report.pdf', 'application/pdf'
+
+        headers = ['ID', 'Turi', 'Sana', 'Foydalanuvchi', 'Xodim (Face ID)', 'Mahsulotlar', 'Izoh']
+        excel_data = (
+            [row.id, row.type_label, row.created_at.strftime("%Y-%m-%d %H:%M"), row.username, row.employee, row.items, row.note]
+            for row in data['rows']
+        )
+        output = ReportService.generate_excel(
+            excel_data, headers,
+            sheet_name="Harakatlar", title=title
+        )
+        return output, f'{name}_report.xlsx', EXCEL_CONTENT_TYPE
+
+    @staticmethod
+    def _render_low_stock(fmt, params):
+        end_date = datetime.strptime(params['date'], '%Y-%m-%d').date()
+        data = ReportService.get_low_stock_report_data(end_date)
+        if fmt == 'csv':
+            # Same forecast list as Excel/PDF, so every format names the same products
+            rows = CsvExport.stream_rows((low_stock_cells(row) for row in data['rows']), LOW_STOCK_COLUMNS)
+            return rows, 'low_stock_report.csv', CSV_CONTENT_TYPE
+        if fmt == 'pdf':
+            context = {
+                'rows': data['rows'],
+                'totals': data['totals'],
+                'generated_at': timezone.now(),
+                'lead_days': settings.REORDER_LEAD_DAYS,
+                'title': 'Kamomat Hisoboti (Low Stock)'
+            }
+            return ReportService._pdf('inventory/reports/low_stock_pdf.html', context, 'rows'), 'low_stock_report.pdf', 'application/pdf'
+
+        excel_data = (
+            [
+                cell.strftime('%d.%m.%Y') if isinstance(cell, date) else cell
+                for cell in low_stock_cells(row)
+            ]
+            for row in data['rows']
+        )
+        output = ReportService.generate_excel(
+            excel_data, LOW_STOCK_COLUMNS,
+            sheet_name="Kamomat", title="Kamomat Hisoboti"
+        )
+        return output, 'low_stock_report.xlsx', EXCEL_CONTENT_TYPE
+
+    @staticmethod
+    def _render_analytics(fmt, params):
+        if fmt != 'excel':
+            raise ReportError("Tahlil faqat Excel formatida")
+
+        end_date = datetime.strptime(params['end_date'], '%Y-%m-%d').date()
+        data = AnalyticsService.inventory_analytics(end_date, params['days'])
+        classes = ', '.join(f"{abc}: {data['classes'].get(abc, 0)}" for abc in 'ABC')
+        title = (
+            f"Ombor Tahlili ({data['start_date'].strftime('%d.%m.%Y')} - "
+            f"{data['end_date'].strftime('%d.%m.%Y')}; {classes})"
+        )
+        headers = [
+            'ABC', 'SKU', 'Nomi', 'Kategoriya', "O'lchov", 'Hozirgi Soni', 'Kirim', 'Chiqim',
+            "Kunlik Sarf", "O'rtacha Qoldiq", 'Aylanma', 'Yetadi (kun)', 'Chiqim Qiymati', 'Ulush %',
+        ]
+        output = ReportService.generate_excel(
+            data['rows'], headers,
+            sheet_name="Tahlil", title=title
+        )
+        return output, f"analytics_{params['days']}d.xlsx", EXCEL_CONTENT_TYPE
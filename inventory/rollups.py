@@ -0,0 +1,152 @@
+"""
+Daily movement rollups.
+
+MovementDailyRollup keeps, per local day, product and movement type, the
+summed quantity and value of VERIFIED movement items and the number of
+documents. StockService keeps it current inside the same transaction that
+changes stock; reports and charts read a few rows per day instead of
+scanning every MovementItem.
+"""
+from datetime import datetime, time, timedelta
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .models import Movement, MovementDailyRollup, MovementItem
+from .versions import ROLLUPS, bump_version
+
+ITEM_VALUE = ExpressionWrapper(
+    F('quantity') * F('unit_price'),
+    output_field=DecimalField(max_digits=18, decimal_places=2)
+)
+
+
+def day_bounds(start_date, end_date):
+    """Aware datetimes [start of start_date, start of the day after end_date)."""
+    start = timezone.make_aware(datetime.combine(start_date, time.min))
+    end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+    return start, end
+
+
+class RollupService:
+    """Maintain and query MovementDailyRollup."""
+
+    @staticmethod
+    def apply(movement: Movement, sign: int = 1):
+        """
+        Add (sign=1) or remove (sign=-1) a movement's items to/from its
+        day's rollups. Must run inside the transaction that verifies or
+        reverses the movement.
+        """
+        day = timezone.localdate(movement.created_at)
+        totals = (
+            MovementItem.objects.filter(movement=movement)
+            .values('product_id')
+            .annotate(qty=Sum('quantity'), value=Sum(ITEM_VALUE))
+            .order_by()
+        )
+        for row in totals:
+            key = {'date': day, 'product_id': row['product_id'], 'movement_type': movement.movement_type}
+            changes = {
+                'quantity': F('quantity') + sign * row['qty'],
+                'value': F('value') + sign * row['value'],
+                'document_count': F('document_count') + sign,
+            }
+            if MovementDailyRollup.objects.filter(**key).update(**changes):
+                if sign < 0:
+                    # Same rows as a rebuild: no empty (date, product, type)
+                    MovementDailyRollup.objects.filter(**key, document_count__lte=0).delete()
+                continue
+            try:
+                with transaction.atomic():
+                    MovementDailyRollup.objects.create(
+                        **key,
+                        quantity=sign * row['qty'],
+                        value=sign * row['value'],
+                        document_count=sign,
+                    )
+            except IntegrityError:
+                # Created concurrently by another transaction
+                MovementDailyRollup.objects.filter(**key).update(**changes)
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(start_date, end_date) -> int:
+        """Recompute the rollups of [start_date, end_date] from movement items."""
+        start, end = day_bounds(start_date, end_date)
+        rows = (
+            MovementItem.objects.filter(
+                movement__status='VERIFIED',
+                movement__created_at__gte=start,
+                movement__created_at__lt=end,
+            )
+            .annotate(day=TruncDate('movement__created_at'))
+            .values('day', 'product_id', 'movement__movement_type')
+            .annotate(
+                qty=Sum('quantity'),
+                value=Sum(ITEM_VALUE),
+                documents=Count('movement_id', distinct=True),
+            )
+            .order_by()
+        )
+        rollups = [
+            MovementDailyRollup(
+                date=row['day'],
+                product_id=row['product_id'],
+                movement_type=row['movement__movement_type'],
+                quantity=row['qty'],
+                value=row['value'] or 0,
+                document_count=row['documents'],
+            )
+            for row in rows
+        ]
+        MovementDailyRollup.objects.filter(date__gte=start_date, date__lte=end_date).delete()
+        MovementDailyRollup.objects.bulk_create(rollups, batch_size=1000)
+        # Reports and the dashboard trend cached from the old rows are stale
+        transaction.on_commit(lambda: bump_version(ROLLUPS))
+        return len(rollups)
+
+    @staticmethod
+    def daily_totals(start_date, end_date) -> list:
+        """
+        [{'date', 'in_qty', 'out_qty'}] for every day in the range,
+        days without movements included.
+        """
+        by_day = {}
+        rows = (
+            MovementDailyRollup.objects.filter(date__gte=start_date, date__lte=end_date)
+            .values('date', 'movement_type')
+            .annotate(qty=Sum('quantity'))
+            .order_by()
+        )
+        for row in rows:
+            by_day[(row['date'], row['movement_type'])] = row['qty']
+
+        days = []
+        day = start_date
+        while day <= end_date:
+            days.append({
+                'date': day,
+                'in_qty': by_day.get((day, 'IN'), 0),
+                'out_qty': by_day.get((day, 'OUT'), 0),
+            })
+            day += timedelta(days=1)
+        return days
+
+    @staticmethod
+    def product_totals(start_date, end_date, movement_type=None):
+        """Per product and type totals for a date range, by product name."""
+        rollups = MovementDailyRollup.objects.filter(date__gte=start_date, date__lte=end_date)
+        if movement_type and movement_type != 'ALL':
+            rollups = rollups.filter(movement_type=movement_type)
+        return (
+            rollups.values(
+                'product__sku', 'product__name', 'product__unit', 'movement_type'
+            )
+            .annotate(
+                quantity_sum=Sum('quantity'),
+                value_sum=Sum('value'),
+                document_sum=Sum('document_count'),
+            )
+            .order_by('product__name', 'movement_type')
+        )
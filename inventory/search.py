@@ -0,0 +1,215 @@
+"""
+Ranked, typo-tolerant product search.
+
+One API (ProductSearch.search) over two database-specific backends:
+- PostgreSQL: pg_trgm GIN indexes on UPPER(name/sku/barcode), matched with
+  the word-similarity operator and ranked by word_similarity()
+- SQLite: FTS5 shadow table with the trigram tokenizer, kept in sync with
+  inventory_product by triggers; candidates are ranked by the share of the
+  query's (word-padded) trigrams they contain
+Other backends (or queries shorter than one trigram on SQLite) fall back to
+plain icontains.
+
+Note: Django rebuilds SQLite tables on some ALTER operations, which drops
+triggers. Call ProductSearch.install() again after such a migration.
+Migration 0003 carries its own copy of the DDL below.
+"""
+import re
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db import connection, OperationalError
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.functions import Cast, Greatest, Upper
+
+FTS_TABLE = 'inventory_product_fts'
+SEARCH_FIELDS = ('name', 'sku', 'barcode')
+
+POSTGRESQL_INSTALL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+] + [
+    f"CREATE INDEX IF NOT EXISTS product_{field}_trgm_idx "
+    f"ON inventory_product USING gin (UPPER({field}) gin_trgm_ops)"
+    for field in SEARCH_FIELDS
+]
+
+POSTGRESQL_UNINSTALL = [
+    f"DROP INDEX IF EXISTS product_{field}_trgm_idx" for field in SEARCH_FIELDS
+]
+
+SQLITE_INSTALL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, sku, barcode,
+        content='inventory_product', content_rowid='id', tokenize='trigram'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON inventory_product BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, sku, barcode)
+        VALUES (new.id, new.name, new.sku, new.barcode);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON inventory_product BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, sku, barcode)
+        VALUES ('delete', old.id, old.name, old.sku, old.barcode);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON inventory_product BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, sku, barcode)
+        VALUES ('delete', old.id, old.name, old.sku, old.barcode);
+        INSERT INTO {FTS_TABLE}(rowid, name, sku, barcode)
+        VALUES (new.id, new.name, new.sku, new.barcode);
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def trigrams(text: str) -> set:
+    """Overlapping 3-character windows, case-insensitive (as FTS5 trigram)."""
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def word_trigrams(text: str) -> set:
+    """
+    pg_trgm style trigrams: per word, padded with two leading and one
+    trailing space, so a typo inside a word still shares its edges.
+    """
+    grams = set()
+    for word in re.findall(r'\w+', text.lower()):
+        grams |= trigrams(f'  {word} ')
+    return grams
+
+
+class ProductSearch:
+    """Search products by name, SKU or barcode with ranking."""
+
+    # Minimum share of the query that has to match (0..1)
+    SIMILARITY = getattr(settings, 'PRODUCT_SEARCH_SIMILARITY', 0.4)
+
+    # SQLite: how many FTS candidates are scored in Python
+    CANDIDATE_LIMIT = 500
+
+    @classmethod
+    def search(cls, queryset, text: str):
+        """
+        Filter a Product queryset to matches for `text`, annotated with
+        `search_rank` (higher is better) and ordered by it, then by name.
+        """
+        text = text.strip()
+        if not text:
+            return queryset
+
+        if connection.vendor == 'postgresql':
+            return cls._search_postgresql(queryset, text)
+
+        if connection.vendor == 'sqlite' and len(text) >= 3:
+            try:
+                return cls._search_sqlite(queryset, text)
+            except OperationalError:
+                # FTS5 table missing (migration not applied) or unsupported
+                pass
+
+        return cls._search_fallback(queryset, text)
+
+    @classmethod
+    def _search_postgresql(cls, queryset, text):
+        from django.contrib.postgres.lookups import TrigramWordSimilar
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        value = text.upper()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT set_config('pg_trgm.word_similarity_threshold', %s, false)",
+                [str(cls.SIMILARITY)]
+            )
+
+        matches = Q()
+        for field in SEARCH_FIELDS:
+            matches |= Q(**{f'{field}__icontains': text})
+            # UPPER(field) %> 'VALUE' - served by the gin_trgm_ops indexes
+            matches |= Q(TrigramWordSimilar(Upper(field), value))
+
+        # word_similarity() is real (float4): as double precision the rank
+        # survives the keyset cursor's JSON round trip and compares equal
+        rank = Cast(
+            Greatest(*(TrigramWordSimilarity(value, Upper(field)) for field in SEARCH_FIELDS)),
+            FloatField()
+        )
+        return queryset.filter(matches).annotate(search_rank=rank).order_by('-search_rank', 'name', 'id')
+
+    @classmethod
+    def _search_sqlite(cls, queryset, text):
+        query_grams = word_trigrams(text)
+        if not query_grams:
+            return cls._search_fallback(queryset, text)
+
+        # Candidates share at least one raw trigram with the query and pass
+        # the caller's filters (category...) before the limit is applied...
+        match = ' OR '.join('"%s"' % gram.replace('"', '""') for gram in trigrams(text))
+        try:
+            allowed, allowed_params = queryset.order_by().values('id').query.sql_with_params()
+        except EmptyResultSet:
+            return queryset.none()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, name, sku, barcode FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND rowid IN ({allowed}) ORDER BY rank LIMIT %s",
+                [match, *allowed_params, cls.CANDIDATE_LIMIT]
+            )
+            candidates = cursor.fetchall()
+
+        # ...and are scored like pg_trgm word similarity (substring = 1.0)
+        needle = text.lower()
+        scores = {}
+        for product_id, *values in candidates:
+            values = [(value or '').lower() for value in values]
+            if any(needle in value for value in values):
+                score = 1.0
+            else:
+                score = max(len(query_grams & word_trigrams(value)) for value in values) / len(query_grams)
+            if score >= cls.SIMILARITY:
+                scores[product_id] = score
+
+        if not scores:
+            return queryset.none()
+
+        rank = Case(
+            *(When(id=product_id, then=Value(score)) for product_id, score in scores.items()),
+            output_field=FloatField()
+        )
+        return queryset.filter(id__in=scores).annotate(search_rank=rank).order_by('-search_rank', 'name', 'id')
+
+    @staticmethod
+    def _search_fallback(queryset, text):
+        return queryset.filter(
+            Q(name__icontains=text) |
+            Q(sku__icontains=text) |
+            Q(barcode__icontains=text)
+        ).annotate(search_rank=Value(1.0, output_field=FloatField())).order_by('-search_rank', 'name', 'id')
+
+    @staticmethod
+    def install(schema_editor=None):
+        """Create the search indexes / FTS table for the current database."""
+        conn = schema_editor.connection if schema_editor else connection
+        statements = {
+            'postgresql': POSTGRESQL_INSTALL,
+            'sqlite': SQLITE_INSTALL,
+        }.get(conn.vendor, [])
+        with conn.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    @staticmethod
+    def uninstall(schema_editor=None):
+        conn = schema_editor.connection if schema_editor else connection
+        statements = {
+            'postgresql': POSTGRESQL_UNINSTALL,
+            'sqlite': SQLITE_UNINSTALL,
+        }.get(conn.vendor, [])
+        with conn.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
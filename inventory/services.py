@@ -2,12 +2,22 @@
 Stock management services with atomic operations.
 - process_movement: Finalize PENDING movement with Face ID
 - reverse_movement: Admin-only reversal
+  (both publish live events for dashboards, see events.py)
+- get_dashboard_stats: Cached dashboard counters and 7-day trend
 """
-from django.db import transaction
+import hashlib
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
 from django.db.models import F
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-from .models import Movement, MovementItem, Stock, Employee
+from .models import Category, Movement, MovementItem, Product, Stock, Employee
+from .versions import CATALOG, EMPLOYEES, MOVEMENTS, ROLLUPS, STOCK, bump_version, get_version
+from .analytics import AnalyticsService
+from .rollups import RollupService, day_bounds
+from .events import broadcaster
 
 
 class StockService:
@@ -47,6 +57,7 @@ class StockService:
         
         # Process each item with row-level lock
         items = movement.items.select_for_update().select_related('product')
+        low_stock = []
         
         for item in items:
             # Get or create stock with lock
@@ -58,13 +69,19 @@ class StockService:
             if movement.movement_type == 'OUT':
                 # Check sufficient stock (DISABLED - allow negative stock as per request)
                 stock.current_qty -= item.quantity
+                if _crossed_min_stock(item.product, stock.current_qty, item.quantity):
+                    low_stock.append(_low_stock_event(item.product, stock.current_qty))
             else:  # IN
                 stock.current_qty += item.quantity
             
             stock.save()
         
+        RollupService.apply(movement, +1)
+        
         movement.status = 'VERIFIED'
         movement.save()
+        transaction.on_commit(lambda: bump_version(MOVEMENTS))
+        _publish_on_commit('movement.verified', _movement_event(movement), low_stock)
         
         return movement
     
@@ -123,7 +140,8 @@ class StockService:
         )
         
         # Create reversal items and update stock
-        for item in movement.items.all():
+        low_stock = []
+        for item in movement.items.select_related('product'):
             MovementItem.objects.create(
                 movement=reversal,
                 product=item.product,
@@ -137,11 +155,24 @@ class StockService:
                 stock.current_qty += item.quantity
             else:  # OUT (reversing an IN)
                 stock.current_qty -= item.quantity
+                if _crossed_min_stock(item.product, stock.current_qty, item.quantity):
+                    low_stock.append(_low_stock_event(item.product, stock.current_qty))
             stock.save()
         
+        # Reports count VERIFIED movements only: swap the original's totals
+        # for the reversal's
+        RollupService.apply(movement, -1)
+        RollupService.apply(reversal, +1)
+        
         # Mark original as cancelled
         movement.status = 'CANCELLED'
         movement.save()
+        transaction.on_commit(lambda: bump_version(MOVEMENTS))
+        _publish_on_commit(
+            'movement.reversed',
+            dict(_movement_event(reversal), original_id=movement.id),
+            low_stock
+        )
         
         return reversal
     
@@ -163,3 +194,98 @@ class StockService:
             'low_stock_count': low_stock_count,
             'total_value': total_value,
         }
+    
+    @staticmethod
+    def today_range():
+        """
+        [start, end) of the local day as aware datetimes. Filtering on a
+        range uses the created_at index; `created_at__date` casts every row.
+        """
+        today = timezone.localdate()
+        return day_bounds(today, today)
+    
+    @staticmethod
+    def get_dashboard_stats():
+        """
+        Dashboard counters, computed by one query (plus the reorder
+        forecast for the low-stock count) and cached under the current
+        data versions (plus the date, for today's counts).
+        """
+        start, end = StockService.today_range()
+        versions = [str(get_version(name)) for name in (CATALOG, STOCK, EMPLOYEES, MOVEMENTS, ROLLUPS)]
+        key = 'inventory:dashboard:' + hashlib.md5(
+            '|'.join(versions + [start.isoformat()]).encode()
+        ).hexdigest()
+        
+        stats = cache.get(key)
+        if stats is None:
+            verified_today = Movement.objects.filter(
+                status='VERIFIED', created_at__gte=start, created_at__lt=end
+            )
+            stats = _count_all({
+                'total_products': Product.objects.all(),
+                'total_categories': Category.objects.all(),
+                'total_employees': Employee.objects.filter(is_active=True),
+                'today_in': verified_today.filter(movement_type='IN'),
+                'today_out': verified_today.filter(movement_type='OUT'),
+            })
+            today = start.date()
+            # Same forecast list as the low-stock report
+            stats['low_stock_count'] = len(AnalyticsService.reorder_list(today))
+            stats['trend'] = RollupService.daily_totals(today - timedelta(days=6), today)
+            stats['trend_max'] = max(
+                [max(day['in_qty'], day['out_qty']) for day in stats['trend']] + [1]
+            )
+            # Versions do the invalidation; the timeout is only a safety net
+            cache.set(key, stats, getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300))
+        return stats
+
+
+def _crossed_min_stock(product, qty_after, decrease) -> bool:
+    """True when a decrease took stock from above the minimum to at/below it."""
+    return qty_after <= product.min_stock < qty_after + decrease
+
+
+def _low_stock_event(product, qty) -> dict:
+    return {
+        'product_id': product.id,
+        'name': product.name,
+        'sku': product.sku,
+        'qty': qty,
+        'min_stock': product.min_stock,
+        'unit': product.unit,
+    }
+
+
+def _movement_event(movement) -> dict:
+    return {
+        'id': movement.id,
+        'movement_type': movement.movement_type,
+        'user': movement.performed_by.username,
+        'employee': movement.face_employee.name if movement.face_employee else None,
+    }
+
+
+def _publish_on_commit(event_type, data, low_stock=()):
+    """Live screens only hear about committed changes."""
+    def publish():
+        broadcaster.publish(event_type, **data)
+        for product in low_stock:
+            broadcaster.publish('stock.low', **product)
+    transaction.on_commit(publish)
+
+
+def _count_all(querysets: dict) -> dict:
+    """
+    COUNT(*) of several querysets in a single round trip:
+    SELECT (SELECT COUNT(*) FROM (...)), (SELECT COUNT(*) FROM (...)), ...
+    """
+    columns, params = [], []
+    for name, queryset in querysets.items():
+        sql, query_params = queryset.order_by().values('pk').query.sql_with_params()
+        columns.append(f'(SELECT COUNT(*) FROM ({sql}) AS {name}_q) AS {name}')
+        params.extend(query_params)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT ' + ', '.join(columns), params)
+        row = cursor.fetchone()
+    return dict(zip(querysets, row))
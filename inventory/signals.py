@@ -1,9 +1,15 @@
 """
-Signals for automatic Stock creation when Product is created.
+Signals for automatic Stock creation when Product is created,
+for keeping the in-memory product lookup index fresh, for logging
+catalog changes for station sync and for bumping the version stamps
+behind conditional GET.
 """
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Product, Stock
+from .models import CatalogChange, Category, Employee, Product, Stock
+from .product_index import product_index
+from .versions import EMPLOYEES, STOCK, bump_version
 
 
 @receiver(post_save, sender=Product)
@@ -11,3 +17,48 @@ def create_stock_for_product(sender, instance, created, **kwargs):
     """Auto-create Stock record when a new Product is created."""
     if created:
         Stock.objects.get_or_create(product=instance, defaults={'current_qty': 0})
+
+
+@receiver(post_save, sender=Product)
+def index_saved_product(sender, instance, **kwargs):
+    """Update the lookup index once the product row is committed."""
+    transaction.on_commit(lambda: product_index.product_saved(instance))
+
+
+@receiver(post_delete, sender=Product)
+def unindex_deleted_product(sender, instance, **kwargs):
+    product_id = instance.pk
+    transaction.on_commit(lambda: product_index.product_deleted(product_id))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reindex_category_products(sender, **kwargs):
+    """Category names are denormalized into the index records."""
+    transaction.on_commit(product_index.invalidate)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def log_product_change(sender, instance, **kwargs):
+    """Written in the same transaction as the change itself."""
+    CatalogChange.record([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+def log_category_change(sender, instance, created, **kwargs):
+    """A renamed category changes every product record in it."""
+    if not created:
+        CatalogChange.record(instance.products.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Stock)
+@receiver(post_delete, sender=Stock)
+def bump_stock_version(sender, **kwargs):
+    transaction.on_commit(lambda: bump_version(STOCK))
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def bump_employees_version(sender, **kwargs):
+    transaction.on_commit(lambda: bump_version(EMPLOYEES))
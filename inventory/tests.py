@@ -0,0 +1,609 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+import json
+from unittest import skipUnless
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from .analytics import AnalyticsService
+from .catalog import CatalogSync
+from .events import broadcaster
+from .exports import CsvExport
+from .models import CatalogChange, Category, Employee, Movement, MovementItem, Product, ReportJob, Stock
+from .product_index import ProductLookupIndex, filter_by_code, product_index
+from .report_cache import ReportCache
+from .report_jobs import ReportJobService
+from .reports import ReportService
+from .rollups import RollupService
+from .search import ProductSearch
+from .services import StockService
+from .versions import CATALOG, bump_version
+
+
+# Version stamps and caches stay out of the project's file cache
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class InventoryTestData:
+    """A user, a category and a few products."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create(username='operator')
+        cls.category = Category.objects.create(name="Elektronika")
+        cls.products = [
+            Product.objects.create(
+                name=f"Mahsulot {i}", sku=f"SKU-{i}", barcode=f"BAR{i:06d}",
+                category=cls.category, unit='dona', min_stock=5,
+            )
+            for i in range(3)
+        ]
+
+    @classmethod
+    def create_movement(cls, movement_type='OUT', status='VERIFIED', items=1, **fields):
+        movement = Movement.objects.create(
+            movement_type=movement_type, status=status, performed_by=cls.user, **fields
+        )
+        for product in cls.products[:items]:
+            MovementItem.objects.create(movement=movement, product=product, quantity=2, unit_price=Decimal('10'))
+        return movement
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RollupVersionTests(InventoryTestData, TestCase):
+
+    def test_rebuild_invalidates_rollup_reports(self):
+        self.create_movement()
+        today = timezone.localdate()
+        params = {'days': 30, 'start_date': (today - timedelta(days=29)).isoformat(), 'end_date': today.isoformat()}
+        keys = {name: ReportCache.key(name, 'excel', params) for name in ('analytics', 'low_stock', 'movement')}
+        stock_key = ReportCache.key('stock', 'excel', {})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            RollupService.rebuild(today - timedelta(days=1), today)
+
+        for name, key in keys.items():
+            self.assertNotEqual(ReportCache.key(name, 'excel', params), key, name)
+        self.assertEqual(ReportCache.key('stock', 'excel', {}), stock_key)
+
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ReversalConsumptionTests(InventoryTestData, TestCase):
+
+    def forecast(self):
+        today = timezone.localdate()
+        data = AnalyticsService.load(today - timedelta(days=29), today, span=14)
+        return data, AnalyticsService.forecast(data, lead_days=7, service_z=1.65)
+
+    def test_reversed_receipt_is_not_consumption(self):
+        self.create_movement('OUT', items=2)
+        receipt = self.create_movement('IN', items=3)
+        today = timezone.localdate()
+        RollupService.rebuild(today, today)
+        data, forecast = self.forecast()
+
+        admin = get_user_model().objects.create(username='admin-user', role='admin')
+        StockService.reverse_movement(receipt, admin, "Xato kirim")
+        reversed_data, reversed_forecast = self.forecast()
+
+        for name in ('daily_use', 'sigma', 'reorder_point'):
+            np.testing.assert_allclose(reversed_forecast[name], forecast[name], err_msg=name)
+        np.testing.assert_allclose(reversed_data['out_qty'], [2, 2, 0])
+        # The reversed receipt itself is gone from the rollups
+        np.testing.assert_allclose(reversed_data['in_qty'], [0, 0, 0])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class LowStockReportTests(InventoryTestData, TestCase):
+
+    def test_every_format_lists_the_forecast(self):
+        # SKU-0 is above min_stock but consumed fast; SKU-2 has plenty of stock
+        for product, qty in zip(self.products, (10, 0, 500)):
+            Stock.objects.filter(product=product).update(current_qty=qty)
+        for _ in range(5):
+            movement = self.create_movement('OUT', items=1)
+            MovementItem.objects.filter(movement=movement).update(quantity=20)
+        today = timezone.localdate()
+        RollupService.rebuild(today, today)
+
+        expected = [row.sku for row in ReportService.get_low_stock_report_data(today)['rows']]
+        self.assertEqual(sorted(expected), ['SKU-0', 'SKU-1'])
+
+        content, _, _ = ReportService._render_low_stock('csv', {'date': today.isoformat()})
+        lines = b''.join(content).decode().splitlines()
+        self.assertEqual([line.split(',')[0] for line in lines[1:]], expected)
+        self.assertEqual(StockService.get_dashboard_stats()['low_stock_count'], len(expected))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CatalogSyncTests(InventoryTestData, TestCase):
+
+    def test_compaction_keeps_deltas(self):
+        since = CatalogSync.version()
+        for name in ("Yangi nom", "Yana yangi nom"):
+            self.products[0].name = name
+            self.products[0].save()
+        deleted_id = self.products[2].pk
+        self.products[2].delete()
+        CatalogChange.objects.update(created_at=timezone.now() - timedelta(days=60))
+        delta = CatalogSync.build(since)
+
+        call_command('compact_catalog_changes', days=30, stdout=StringIO())
+
+        self.assertEqual(CatalogChange.objects.count(), 3)
+        self.assertEqual(CatalogSync.build(since), delta)
+        self.assertEqual([row[0] for row in delta['products']], [self.products[0].pk])
+        self.assertEqual(delta['deleted'], [deleted_id])
+
+    def test_etag_changes_on_commit(self):
+        etag = CatalogSync.etag(1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.products[1].save()
+        self.assertNotEqual(CatalogSync.etag(1), etag)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ProductLookupIndexTests(InventoryTestData, TestCase):
+
+    def test_local_change_after_foreign_bump_rebuilds(self):
+        index = ProductLookupIndex()
+        self.assertEqual(index.lookup('bar000001').sku, 'SKU-1')
+
+        # Another process renames a product and bumps the stamp
+        Product.objects.filter(pk=self.products[1].pk).update(name="Boshqa jarayonda")
+        bump_version(CATALOG)
+        self.products[0].name = "Shu jarayonda"
+        self.products[0].save()
+        index.product_saved(self.products[0])
+
+        self.assertEqual(index.lookup('BAR000000').name, "Shu jarayonda")
+        self.assertEqual(index.lookup('BAR000001').name, "Boshqa jarayonda")
+
+    def test_own_change_is_applied_in_place(self):
+        index = ProductLookupIndex()
+        index.lookup('BAR000000')
+        self.products[0].name = "Yangi nom"
+        self.products[0].save()
+        with self.assertNumQueries(0):
+            index.product_saved(self.products[0])
+            self.assertEqual(index.lookup('BAR000000').name, "Yangi nom")
+
+
+@override_settings(CACHES=TEST_CACHES)
+class DashboardStatsTests(InventoryTestData, TestCase):
+
+    def tearDown(self):
+        # Rolling back the test data leaves the stamps alone: drop the cached counters
+        cache.clear()
+
+    def test_cached_until_a_movement_is_verified(self):
+        movement = self.create_movement('OUT', status='PENDING', items=2)
+        stats = StockService.get_dashboard_stats()
+        self.assertEqual((stats['total_products'], stats['today_out']), (3, 0))
+        with self.assertNumQueries(0):
+            self.assertEqual(StockService.get_dashboard_stats(), stats)
+
+        employee = Employee.objects.create(name="Ali", employee_id='E-1', face_label=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            StockService.process_movement(movement, employee.pk, 0.9)
+
+        self.client.force_login(self.user)
+        stats = self.client.get(reverse('dashboard_stats')).json()
+        self.assertEqual(stats['today_out'], 1)
+        self.assertEqual(stats['trend'][-1]['out_qty'], 4)
+        with self.assertNumQueries(0):
+            self.assertEqual(StockService.get_dashboard_stats()['today_out'], 1)
+
+    def test_cached_until_the_catalog_changes(self):
+        StockService.get_dashboard_stats()
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(name="Yangi", sku='SKU-9', barcode='BAR000009', category=self.category)
+        self.assertEqual(StockService.get_dashboard_stats()['total_products'], 4)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class LiveEventsTests(InventoryTestData, TestCase):
+
+    def setUp(self):
+        self.admin = get_user_model().objects.create(username='admin-user', role='admin')
+        self.client.force_login(self.admin)
+
+    def poll(self, since=None):
+        params = {'since': since} if since is not None else {}
+        return self.client.get(reverse('events_poll'), params).json()
+
+    def reverse_receipt(self):
+        receipt = self.create_movement('IN', items=2)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('reverse_movement', args=[receipt.pk]),
+                {'reason': "Xato kirim"}, content_type='application/json',
+            )
+        return receipt, response.json()['reversal_id']
+
+    def test_poll_without_cursor(self):
+        self.assertEqual(self.poll(), {'cursor': broadcaster.cursor(), 'reset': False, 'events': []})
+        self.assertTrue(self.poll('garbage')['reset'])
+
+    def test_poll_returns_the_reversal(self):
+        cursor = self.poll()['cursor']
+        receipt, reversal_id = self.reverse_receipt()
+
+        payload = self.poll(cursor)
+        self.assertFalse(payload['reset'])
+        [event] = payload['events']
+        self.assertEqual(event['type'], 'movement.reversed')
+        self.assertEqual(event['data']['id'], reversal_id)
+        self.assertEqual(event['data']['original_id'], receipt.pk)
+        self.assertEqual(event['data']['user'], 'admin-user')
+        # The live banner links /movement/<original_id>/, the reversed document
+        self.assertEqual(reverse('movement_detail', args=[receipt.pk]), f"/movement/{receipt.pk}/")
+        self.assertEqual(self.poll(payload['cursor'])['events'], [])
+
+    def test_stream_resumes_after_cursor(self):
+        cursor = self.poll()['cursor']
+        receipt, reversal_id = self.reverse_receipt()
+
+        response = self.client.get(reverse('events_stream'), HTTP_LAST_EVENT_ID=cursor)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = iter(response.streaming_content)
+        self.assertEqual(next(chunks), b'retry: 5000\n\n')
+        lines = next(chunks).decode().splitlines()
+        response.close()
+
+        self.assertEqual(lines[1], 'event: movement.reversed')
+        self.assertTrue(lines[0].startswith('id: '))
+        data = json.loads(lines[2].removeprefix('data: '))
+        self.assertEqual((data['data']['id'], data['data']['original_id']), (reversal_id, receipt.pk))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ConditionalGetTests(InventoryTestData, TestCase):
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def assertNotModified(self, url, params=None):
+        """A 200 with an ETag, then 304 for the same If-None-Match; returns the tag."""
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        return etag
+
+    def save_product(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.products[1].name = "Yangi nom"
+            self.products[1].save()
+
+    def test_product_by_barcode(self):
+        url, params = reverse('product_by_barcode'), {'q': 'BAR000001'}
+        etag = self.assertNotModified(url, params)
+        self.save_product()
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.json()['product']['name'], "Yangi nom")
+
+    def test_product_list(self):
+        etag = self.assertNotModified(reverse('product_list'))
+        self.save_product()
+        self.assertEqual(self.client.get(reverse('product_list'), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_movement_detail(self):
+        movement = self.create_movement(status='PENDING', items=1)
+        url = reverse('movement_detail', args=[movement.pk])
+        etag = self.assertNotModified(url)
+        MovementItem.objects.create(movement=movement, product=self.products[2], quantity=1, unit_price=1)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_qr_code(self):
+        self.assertNotModified(reverse('qr_code_single', args=[self.products[0].pk]))
+
+    def test_catalog_sync_delta(self):
+        url = reverse('catalog_sync')
+        full = self.client.get(url).json()
+        self.assertTrue(full['full'])
+        self.assertEqual(len(full['products']), 3)
+        params = {'since': full['version']}
+        etag = self.assertNotModified(url, params)
+
+        self.save_product()
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        delta = response.json()
+        self.assertFalse(delta['full'])
+        self.assertGreater(delta['version'], full['version'])
+        # Recent changes are re-sent (OVERLAP); the renamed product is among them
+        names = {row[0]: row[3] for row in delta['products']}
+        self.assertEqual(names[self.products[1].pk], "Yangi nom")
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AutocompleteTests(InventoryTestData, TestCase):
+
+    def setUp(self):
+        product_index.invalidate()
+        self.client.force_login(self.user)
+
+    def suggest(self, query, **params):
+        response = self.client.get(reverse('product_autocomplete'), {'q': query, **params})
+        return [result['sku'] for result in response.json()['results']]
+
+    def test_prefix_of_name_word_or_sku(self):
+        Product.objects.create(
+            name="iPhone 15 Pro", sku="IPH-15", barcode="IPH000015", category=self.category, unit='dona'
+        )
+        Product.objects.create(
+            name="Pro Max qopqoq", sku="CASE-1", barcode="CASE00001", category=self.category, unit='dona'
+        )
+        # Whole-name matches first, then name-word matches
+        self.assertEqual(self.suggest('pro'), ['CASE-1', 'IPH-15'])
+        self.assertEqual(self.suggest('iph'), ['IPH-15'])
+        self.assertEqual(self.suggest('sku-'), ['SKU-0', 'SKU-1', 'SKU-2'])
+        self.assertEqual(self.suggest('sku-', limit=2), ['SKU-0', 'SKU-1'])
+        self.assertEqual(self.suggest('s'), [])
+
+    def test_saved_product_is_suggested_without_rebuild(self):
+        self.suggest('mahsulot')  # builds the index
+        product = self.products[0]
+        product.name = "Zaryadlovchi"
+        with self.captureOnCommitCallbacks(execute=True):
+            product.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(product_index.autocomplete('zaryad')[0].sku, 'SKU-0')
+        self.assertNotIn('SKU-0', self.suggest('mahsulot'))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class BatchLookupTests(InventoryTestData, TestCase):
+
+    def setUp(self):
+        # The process-wide index may hold products of earlier tests
+        product_index.invalidate()
+        self.client.force_login(self.user)
+        self.url = reverse('products_by_barcodes')
+
+    def post(self, body):
+        return self.client.post(self.url, body, content_type='application/json')
+
+    def test_resolves_barcodes_skus_and_misses(self):
+        response = self.post({'codes': [' bar000001 ', 'SKU-2', 'NOPE', '']})
+        results = response.json()['results']
+        self.assertEqual(results['bar000001']['product']['sku'], 'SKU-1')
+        self.assertEqual(results['SKU-2']['product']['barcode'], 'BAR000002')
+        self.assertFalse(results['NOPE']['found'])
+        self.assertFalse(results['']['found'])
+
+    def test_query_count_does_not_grow_with_codes(self):
+        self.post({'codes': ['BAR000000']})  # builds the index
+
+        with CaptureQueriesContext(connection) as one:
+            self.post({'codes': ['BAR000000', 'MISSING-0']})
+        codes = [f'BAR{i:06d}' for i in range(3)] + [f'MISSING-{i}' for i in range(40)]
+        with self.assertNumQueries(len(one)):
+            response = self.post({'codes': codes})
+        self.assertEqual(sum(result['found'] for result in response.json()['results'].values()), 3)
+
+    def test_body_must_be_an_object(self):
+        for body in ('[]', '"x"', '1', 'null', '{bad'):
+            response = self.client.post(self.url, body, content_type='application/json')
+            self.assertEqual(response.status_code, 400, body)
+            self.assertEqual(response.json()['error'], 'Invalid JSON')
+
+
+@override_settings(CACHES=TEST_CACHES, REPORT_JOB_TIMEOUT=60)
+class ReportJobTests(InventoryTestData, TestCase):
+
+    def queue(self):
+        return ReportJobService.enqueue(self.user, 'stock', 'excel', {})
+
+    def test_pending_job_without_worker(self):
+        self.client.force_login(self.user)
+        job = self.queue()
+        url = reverse('report_job_status', args=[job.pk])
+        self.assertFalse(self.client.get(url).json()['job']['worker_available'])
+
+        ReportJobService.heartbeat()
+        self.assertTrue(self.client.get(url).json()['job']['worker_available'])
+
+    def test_stale_pending_job_fails_and_can_be_queued_again(self):
+        job = self.queue()
+        self.assertEqual(self.queue().pk, job.pk)
+        ReportJob.objects.filter(pk=job.pk).update(created_at=timezone.now() - timedelta(minutes=5))
+
+        self.assertNotEqual(self.queue().pk, job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'FAILED')
+
+
+@override_settings(CACHES=TEST_CACHES)
+class SearchPaginationTests(InventoryTestData, TestCase):
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            # pg_trgm comes from migration 0003; databases built without it skip
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                if cursor.fetchone() is None:
+                    self.skipTest("pg_trgm is not installed")
+
+    def test_search_pages_have_no_duplicates(self):
+        Product.objects.bulk_create([
+            Product(
+                name=f"Kabel {'mis ' * (i % 7)}{i}", sku=f"KB-{i}", barcode=f"KB{i:06d}",
+                category=self.category, unit='metr',
+            )
+            for i in range(120)
+        ])
+        self.client.force_login(self.user)
+        url = reverse('product_list')
+        seen, cursor = [], None
+        with self.settings(DEFAULT_PAGE_SIZE=25):
+            while True:
+                params = {'q': 'kabel mis'}
+                if cursor:
+                    params['cursor'] = cursor
+                page = self.client.get(url, params).context['products']
+                seen.extend(product.pk for product in page)
+                if not page.has_next():
+                    break
+                cursor = page.next_cursor
+
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(len(seen), ProductSearch.search(Product.objects.all(), 'kabel mis').count())
+
+
+@skipUnless(connection.vendor == 'sqlite', "FTS5 search backend")
+@override_settings(CACHES=TEST_CACHES)
+class SqliteSearchTests(InventoryTestData, TestCase):
+
+    def test_filter_applies_before_candidate_limit(self):
+        crowded = Category.objects.create(name="Kabellar")
+        Product.objects.bulk_create([
+            Product(name=f"Kabel {i}", sku=f"KB-{i}", barcode=f"KB{i:06d}", category=crowded, unit='metr')
+            for i in range(ProductSearch.CANDIDATE_LIMIT + 100)
+        ])
+        # A long name ranks below every short "Kabel N" in FTS5 (bm25)
+        wanted = Product.objects.create(
+            name="Mis sim o'ralgan ikki qavatli izolyatsiyali uzun kabel", sku="KM-1",
+            barcode="KM000001", category=self.category, unit='metr'
+        )
+
+        found = ProductSearch.search(Product.objects.filter(category=self.category), "kabel")
+        self.assertEqual(list(found), [wanted])
+        self.assertFalse(ProductSearch.search(Product.objects.none(), "kabel").exists())
+
+
+@override_settings(CACHES=TEST_CACHES)
+class MovementCsvTests(InventoryTestData, TestCase):
+
+    def test_created_at_is_local_time(self):
+        movement = self.create_movement()
+        # 20:30 UTC is 01:30 of the next day in Tashkent (UTC+5)
+        created_at = datetime(2026, 3, 1, 20, 30, 15, tzinfo=dt_timezone.utc)
+        Movement.objects.filter(pk=movement.pk).update(created_at=created_at)
+
+        query = ReportService.get_movement_csv_query(created_at - timedelta(days=1), created_at + timedelta(days=1))
+        csv = b''.join(CsvExport._iterator_chunks(query)).decode()
+        self.assertEqual(csv.split(',')[:3], [str(movement.pk), 'Chiqim', '2026-03-02 01:30:15'])
+
+        # COPY writes the raw SELECT columns: same order as the header
+        with connection.cursor() as cursor:
+            cursor.execute(*query.query.sql_with_params())
+            self.assertEqual(list(cursor.fetchone())[:2], [movement.pk, 'Chiqim'])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class MovementListQueryTests(InventoryTestData, TestCase):
+    """Item totals come from SQL annotations, not per-row queries."""
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('movement_list'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_list_queries_do_not_grow_with_rows(self):
+        self.create_movement(items=3)
+        one_row = self.list_queries()
+        for _ in range(49):
+            self.create_movement(items=3)
+        with self.assertNumQueries(one_row):
+            response = self.client.get(reverse('movement_list'))
+        self.assertEqual(len(response.context['movements']), 50)
+
+    def test_totals_use_annotations(self):
+        for items in (1, 2, 3):
+            self.create_movement(items=items)
+        movements = list(Movement.objects.with_totals().order_by('id'))
+        with self.assertNumQueries(0):
+            totals = [(m.total_items, m.total_quantity, m.total_value) for m in movements]
+        self.assertEqual(totals, [(1, 2, Decimal('20')), (2, 4, Decimal('40')), (3, 6, Decimal('60'))])
+
+
+class QueryPlanTestCase(InventoryTestData, TestCase):
+    """Assert that a query's plan uses an index, on a seeded table."""
+
+    def assertUsesIndex(self, queryset, index_name):
+        # Fresh statistics, so the planner (PostgreSQL or SQLite) sees the seed
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {queryset.model._meta.db_table}')
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, plan)
+
+
+class MovementIndexTests(QueryPlanTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        other = get_user_model().objects.create(username='other')
+        statuses = ['VERIFIED'] * 8 + ['CANCELLED', 'PENDING']
+        movements = Movement.objects.bulk_create([
+            Movement(
+                movement_type='IN' if i % 3 else 'OUT',
+                status=statuses[i % len(statuses)],
+                performed_by=cls.user if i % 2 else other,
+            )
+            for i in range(5000)
+        ])
+        # Spread the movements over a year (bulk_create sets created_at to now)
+        now = timezone.now()
+        for i, movement in enumerate(movements):
+            movement.created_at = now - timedelta(days=i % 365)
+        Movement.objects.bulk_update(movements, ['created_at'], batch_size=500)
+
+    def setUp(self):
+        self.end = timezone.now()
+        self.start = self.end - timedelta(days=7)
+
+    def test_pending_document_lookup(self):
+        # movement_in / movement_out: the user's open document, newest first
+        pending = Movement.objects.filter(performed_by=self.user, movement_type='IN', status='PENDING')
+        self.assertUsesIndex(pending.order_by('-created_at')[:1], 'movement_pending_user_idx')
+
+    def test_verified_by_type_range(self):
+        movements = Movement.objects.filter(
+            status='VERIFIED', movement_type='OUT', created_at__gte=self.start, created_at__lt=self.end
+        )
+        self.assertUsesIndex(movements, 'movement_verified_type_idx')
+
+    def test_verified_by_date_range(self):
+        movements = Movement.objects.filter(status='VERIFIED', created_at__gte=self.start, created_at__lt=self.end)
+        self.assertUsesIndex(movements, 'movement_verified_date_idx')
+
+
+class ProductCodeIndexTests(QueryPlanTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Product.objects.bulk_create([
+            Product(
+                name=f"Seeded {i}", sku=f"seed-{i}", barcode=f"SEED{i:08d}",
+                category=cls.category, unit='dona',
+            )
+            for i in range(5000)
+        ])
+
+    def test_barcode_lookup_uses_expression_index(self):
+        products = filter_by_code(Product.objects, 'barcode', ' seed00001234 ')
+        self.assertEqual(products.get().sku, 'seed-1234')
+        self.assertUsesIndex(products, 'product_barcode_norm_idx')
+
+    def test_sku_lookup_uses_expression_index(self):
+        products = filter_by_code(Product.objects, 'sku', 'Seed-1234')
+        self.assertEqual(products.get().barcode, 'SEED00001234')
+        self.assertUsesIndex(products, 'product_sku_norm_idx')
@@ -7,6 +7,11 @@ from . import views
 urlpatterns = [
     # Dashboard
     path('', views.dashboard, name='dashboard'),
+    path('dashboard/stats/', views.dashboard_stats, name='dashboard_stats'),
+    
+    # Live events
+    path('events/', views.events_stream, name='events_stream'),
+    path('events/poll/', views.events_poll, name='events_poll'),
     
     # Face verification
     path('face/verify/', views.face_verify, name='face_verify'),
@@ -16,6 +21,9 @@ urlpatterns = [
     # Products
     path('products/', views.product_list, name='product_list'),
     path('product/by-barcode/', views.product_by_barcode, name='product_by_barcode'),
+    path('product/by-barcodes/', views.products_by_barcodes, name='products_by_barcodes'),
+    path('product/autocomplete/', views.product_autocomplete, name='product_autocomplete'),
+    path('product/catalog/', views.catalog_sync, name='catalog_sync'),
     
     # Movements
     path('movement/in/', views.movement_in, name='movement_in'),
@@ -42,6 +50,9 @@ urlpatterns = [
     path('reports/stock/', views.download_stock_report, name='download_stock_report'),
     path('reports/movement/', views.download_movement_report, name='download_movement_report'),
     path('reports/low-stock/', views.download_low_stock_report, name='download_low_stock_report'),
+    path('reports/jobs/', views.report_job_create, name='report_job_create'),
+    path('reports/jobs/<int:job_id>/', views.report_job_status, name='report_job_status'),
+    path('reports/jobs/<int:job_id>/download/', views.report_job_download, name='report_job_download'),
     
     # QR Codes
     path('qr-codes/', views.qr_code_dashboard, name='qr_code_dashboard'),
@@ -0,0 +1,55 @@
+"""
+Cross-process data version stamps.
+
+Each stamp is an integer counter kept in the Django cache. Writers bump
+the stamp after their transaction commits; readers compare it with what they
+built their in-memory state (or cache keys) from and rebuild on mismatch.
+Settings must point CACHES at a backend shared by all worker processes.
+
+A bump is cache.incr(), so a writer can tell from the returned value whether
+anyone else bumped in between (see ProductLookupIndex._apply). incr() is
+atomic on memcached and Redis; the file and database backends read and
+write, so two bumps landing at the same instant can still collapse into
+one there. Counters start at a random value: after the cache is cleared,
+old stamps are not reused.
+"""
+import secrets
+from django.core.cache import cache
+
+# Counters; the random tokens of older releases stay under 'inventory:version:'
+KEY_PREFIX = 'inventory:counter:'
+
+# Product, category and catalog-level changes
+CATALOG = 'catalog'
+
+# Stock quantities
+STOCK = 'stock'
+
+# Verified and reversed movements
+MOVEMENTS = 'movements'
+
+# Employees (names, Face ID registration)
+EMPLOYEES = 'employees'
+
+# Daily movement rollups rebuilt from history (backfill, archive)
+ROLLUPS = 'rollups'
+
+
+def get_version(name: str) -> int:
+    """Return the current stamp for `name`, creating it on first use."""
+    key = KEY_PREFIX + name
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, secrets.randbits(48), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(name: str) -> int:
+    """Increment the stamp for `name` and return the new value."""
+    try:
+        return cache.incr(KEY_PREFIX + name)
+    except ValueError:
+        # Missing (first use or cache cleared): start a counter, then bump
+        get_version(name)
+        return cache.incr(KEY_PREFIX + name)
@@ -1,6 +1,6 @@
 """
 Inventory views for warehouse management.
-- Dashboard
+- Dashboard and live events (SSE)
 - Movement IN/OUT with Face ID verification
 - Product list with pagination and QR lookup
 - Face verification endpoint
@@ -9,21 +9,32 @@ Inventory views for warehouse management.
 import json
 import os
 import glob
+import time
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse, FileResponse, HttpResponseForbidden
+from django.http import JsonResponse, FileResponse, HttpResponseForbidden, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_POST, require_GET
-from django.core.paginator import Paginator
-from django.db.models import Q, Sum
+from django.urls import reverse
+from django.views.decorators.http import require_POST, require_GET, condition
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.cache import cache_control
+from django.db.models import Count, Exists, Max, OuterRef, Sum
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 from django.conf import settings
 from django.contrib import messages
 
 from accounts.decorators import admin_required, operator_required
-from .models import Employee, Category, Product, Stock, Movement, MovementItem
+from .models import Employee, Category, Product, Stock, Movement, MovementItem, ReportJob
 from .services import StockService
 from .face_service import FaceService
+from .product_index import product_index, ProductRecord, filter_by_code
+from .search import ProductSearch
+from .pagination import KeysetPaginator
+from .catalog import CatalogSync
+from .conditional import make_etag, page_etag, ranged_file_response, versions_etag
+from .versions import CATALOG, EMPLOYEES, STOCK, get_version
+from .analytics import ANALYTICS_PERIODS, DEFAULT_ANALYTICS_DAYS
+from .events import broadcaster
 
 
 # ============================================
@@ -90,45 +101,110 @@ def clear_face_session(request):
 @login_required
 def dashboard(request):
     """Main dashboard with statistics."""
-    # Get counts
-    total_products = Product.objects.count()
-    total_categories = Category.objects.count()
-    total_employees = Employee.objects.filter(is_active=True).count()
-    
-    # Stock summary
-    stocks = Stock.objects.select_related('product').all()
-    low_stock_count = sum(1 for s in stocks if s.is_low_stock)
+    # Counters: one query, cached until the underlying data changes
+    stats = StockService.get_dashboard_stats()
     
     # Recent movements
     recent_movements = Movement.objects.select_related(
         'performed_by', 'face_employee'
     ).order_by('-created_at')[:10]
     
-    # Today's movements
-    today = timezone.now().date()
-    today_in = Movement.objects.filter(
-        movement_type='IN', 
-        status='VERIFIED',
-        created_at__date=today
-    ).count()
-    today_out = Movement.objects.filter(
-        movement_type='OUT', 
-        status='VERIFIED',
-        created_at__date=today
-    ).count()
-    
     context = {
-        'total_products': total_products,
-        'total_categories': total_categories,
-        'total_employees': total_employees,
-        'low_stock_count': low_stock_count,
+        **stats,
         'recent_movements': recent_movements,
-        'today_in': today_in,
-        'today_out': today_out,
     }
     return render(request, 'inventory/dashboard.html', context)
 
 
+@login_required
+@require_GET
+def dashboard_stats(request):
+    """Dashboard counters as JSON, for live refresh (served from cache)."""
+    return JsonResponse(StockService.get_dashboard_stats())
+
+
+# ============================================
+# Live Events
+# ============================================
+
+# Comment line sent when nothing happened, keeps proxies from closing the stream
+EVENTS_HEARTBEAT_SECONDS = 15
+
+# A stream ends after this long; EventSource reconnects with Last-Event-ID
+EVENTS_STREAM_SECONDS = 300
+
+
+def _sse(event_type, data, event_id=None):
+    lines = [f'id: {event_id}'] if event_id else []
+    lines.append(f'event: {event_type}')
+    lines.append('data: ' + json.dumps(data, separators=(',', ':'), ensure_ascii=False))
+    return '\n'.join(lines) + '\n\n'
+
+
+@login_required
+@require_GET
+def events_stream(request):
+    """
+    GET /events/ - server-sent events for live screens.
+
+    Resumes after the Last-Event-ID header (or ?since=) on reconnect;
+    sends `reset` when the client missed more than the buffer holds.
+    """
+    cursor = request.headers.get('Last-Event-ID') or request.GET.get('since')
+    event_id = broadcaster.parse_cursor(cursor)
+    reset = bool(cursor) and event_id is None
+    if event_id is None:
+        event_id = broadcaster.last_id
+
+    def stream(event_id, reset):
+        yield 'retry: 5000\n\n'
+        if reset:
+            yield _sse('reset', {}, broadcaster.cursor(event_id))
+        deadline = time.monotonic() + EVENTS_STREAM_SECONDS
+        while time.monotonic() < deadline:
+            events, missed = broadcaster.wait(event_id, EVENTS_HEARTBEAT_SECONDS)
+            if missed:
+                event_id = broadcaster.last_id
+                yield _sse('reset', {}, broadcaster.cursor(event_id))
+                continue
+            if not events:
+                yield ': ping\n\n'
+                continue
+            for event in events:
+                event_id = event.id
+                yield _sse(event.type, event.as_dict(), broadcaster.cursor(event.id))
+
+    response = StreamingHttpResponse(stream(event_id, reset), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@login_required
+@require_GET
+def events_poll(request):
+    """
+    GET /events/poll/?since=<cursor> - polling fallback for browsers or
+    proxies without EventSource. Returns the events after the cursor and
+    the cursor to send next time.
+    """
+    cursor = request.GET.get('since')
+    event_id = broadcaster.parse_cursor(cursor)
+    if event_id is None:
+        return JsonResponse({
+            'cursor': broadcaster.cursor(),
+            'reset': bool(cursor),
+            'events': [],
+        })
+
+    events, reset = broadcaster.since(event_id)
+    return JsonResponse({
+        'cursor': broadcaster.cursor(events[-1].id if events else event_id),
+        'reset': reset,
+        'events': [event.as_dict() for event in events],
+    })
+
+
 # ============================================
 # Face Verification Endpoints
 # ============================================
@@ -184,8 +260,17 @@ def face_verify(request):
     return JsonResponse({'ok': False, 'error': result['message']})
 
 
+def _face_status_etag(request):
+    return make_etag(
+        check_face_verified(request),
+        request.session.get('face_confidence', 0),
+        get_version(EMPLOYEES)
+    )
+
+
 @login_required
 @require_GET
+@condition(etag_func=_face_status_etag)
 def face_status(request):
     """Check current face verification status."""
     employee_id = check_face_verified(request)
@@ -259,56 +344,187 @@ def face_register(request, employee_id):
 # Product Endpoints
 # ============================================
 
+# Upper bound for one scanner burst request
+MAX_BATCH_CODES = 200
+
+# Autocomplete suggestions per request (default / upper bound)
+AUTOCOMPLETE_LIMIT = 10
+MAX_AUTOCOMPLETE_LIMIT = 50
+
+
+def _catalog_since(request):
+    try:
+        return max(int(request.GET.get('since', 0)), 0)
+    except ValueError:
+        return 0
+
+
+def _filter_query_string(request):
+    """Current filters without the pagination cursor, for page links."""
+    params = request.GET.copy()
+    params.pop('cursor', None)
+    params.pop('page', None)
+    return params.urlencode()
+
+
 @login_required
 @require_GET
+@condition(etag_func=lambda request: versions_etag(request, CATALOG, STOCK))
 def product_by_barcode(request):
     """
     GET /inventory/product/by-barcode/?q=...
     
     Returns product info with current stock.
     Supports Barcode, SKU, and Name search.
+
+    Barcode/SKU scans are resolved from the in-memory index, so a typical
+    scan costs a single query for the live stock quantity.
     """
     query = request.GET.get('q', '').strip()
     if not query:
         return JsonResponse({'found': False, 'error': 'Kod berilmadi'})
-    
+
     try:
-        # Try exact/insensitive match on Barcode first (most common)
-        product = Product.objects.filter(barcode__iexact=query).first()
-        
-        # If not found, try SKU
-        if not product:
-            product = Product.objects.filter(sku__iexact=query).first()
-            
-        # If still not found, try Name (only if query is long enough to avoid bad matches)
-        if not product and len(query) > 3:
-            product = Product.objects.filter(name__icontains=query).first()
-            
-        if not product:
-             return JsonResponse({'found': False, 'error': f'Mahsulot topilmadi: {query}'})
-
-        # Get stock info
-        stock = Stock.objects.filter(product=product).first()
-        
+        record = product_index.lookup(query)
+
+        if not record:
+            # Index miss: the row may have been written without signals
+            # (bulk operations, fixtures), so check the database as before
+            product = filter_by_code(Product.objects, 'barcode', query).first()
+            if not product:
+                product = filter_by_code(Product.objects, 'sku', query).first()
+
+            # If still not found, try Name (only if query is long enough to avoid bad matches)
+            if not product and len(query) > 3:
+                product = ProductSearch.search(
+                    Product.objects.select_related('category'), query
+                ).first()
+
+            if not product:
+                return JsonResponse({'found': False, 'error': f'Mahsulot topilmadi: {query}'})
+
+            record = ProductRecord.from_product(product)
+
+        # Live stock is the only thing not cached
+        stock_qty = Stock.objects.filter(product_id=record.id).values_list(
+            'current_qty', flat=True
+        ).first()
+
         return JsonResponse({
             'found': True,
-            'product': {
-                'id': product.id,
-                'uid': str(product.uid),
-                'name': product.name,
-                'sku': product.sku,
-                'barcode': product.barcode,
-                'unit': product.unit,
-                'category': product.category.name,
-                'stock_qty': stock.current_qty if stock else 0,
-                'min_stock': product.min_stock
-            }
+            'product': record.as_dict(stock_qty or 0)
         })
     except Exception as e:
         return JsonResponse({'found': False, 'error': str(e)})
 
 
 @login_required
+@require_POST
+def products_by_barcodes(request):
+    """
+    POST /product/by-barcodes/
+    Body: {"codes": ["...", "...", ...]}
+
+    Burst mode for handheld scanners: resolves every code in one round trip
+    with a constant number of queries (index misses + one stock query).
+    Returns: {"ok": true, "results": {code: {"found": bool, ...}}}
+    """
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        return JsonResponse({'ok': False, 'error': 'Invalid JSON'}, status=400)
+
+    codes = data.get('codes')
+    if not isinstance(codes, list) or not codes:
+        return JsonResponse({'ok': False, 'error': 'Kodlar berilmadi'}, status=400)
+    if len(codes) > MAX_BATCH_CODES:
+        return JsonResponse({
+            'ok': False,
+            'error': f'Bir so\'rovda ko\'pi bilan {MAX_BATCH_CODES} ta kod'
+        }, status=400)
+
+    codes = [str(code).strip() for code in codes]
+    records = product_index.resolve_many(code for code in codes if code)
+
+    found_ids = {record.id for record in records.values() if record}
+    stock_by_product = dict(
+        Stock.objects.filter(product_id__in=found_ids).values_list('product_id', 'current_qty')
+    )
+
+    results = {}
+    for code in codes:
+        record = records.get(code)
+        if record:
+            results[code] = {
+                'found': True,
+                'product': record.as_dict(stock_by_product.get(record.id, 0))
+            }
+        else:
+            results[code] = {
+                'found': False,
+                'error': f'Mahsulot topilmadi: {code}' if code else 'Kod berilmadi'
+            }
+
+    return JsonResponse({'ok': True, 'results': results})
+
+
+@login_required
+@require_GET
+@condition(etag_func=lambda request: versions_etag(request, CATALOG))
+def product_autocomplete(request):
+    """
+    GET /product/autocomplete/?q=...&limit=10
+
+    Prefix suggestions by name, name word or SKU from the in-memory index
+    (no database query). Stock is not included; the selected product is
+    then resolved through product_by_barcode.
+    """
+    query = request.GET.get('q', '').strip()
+    try:
+        limit = min(max(int(request.GET.get('limit', AUTOCOMPLETE_LIMIT)), 1), MAX_AUTOCOMPLETE_LIMIT)
+    except ValueError:
+        limit = AUTOCOMPLETE_LIMIT
+
+    if len(query) < 2:
+        return JsonResponse({'results': []})
+
+    return JsonResponse({
+        'results': [
+            {
+                'id': record.id,
+                'name': record.name,
+                'sku': record.sku,
+                'barcode': record.barcode,
+                'unit': record.unit,
+                'category': record.category,
+            }
+            for record in product_index.autocomplete(query, limit)
+        ]
+    })
+
+
+@login_required
+@require_GET
+@gzip_page
+@condition(etag_func=lambda request: CatalogSync.etag(_catalog_since(request)))
+def catalog_sync(request):
+    """
+    GET /product/catalog/?since=<version>
+
+    Product catalog for scanner stations: a full snapshot without `since`,
+    otherwise only products changed after that version (plus deleted ids).
+    Unchanged catalogs answer 304 to If-None-Match.
+    """
+    return JsonResponse(
+        CatalogSync.build(_catalog_since(request)),
+        json_dumps_params={'separators': (',', ':'), 'ensure_ascii': False}
+    )
+
+
+@login_required
+@condition(etag_func=lambda request: page_etag(request, CATALOG, STOCK))
 def product_list(request):
     """Paginated product list with search."""
     search = request.GET.get('q', '').strip()
@@ -316,21 +532,20 @@ def product_list(request):
     
     products = Product.objects.select_related('category', 'stock').all()
     
-    if search:
-        products = products.filter(
-            Q(name__icontains=search) |
-            Q(sku__icontains=search) |
-            Q(barcode__icontains=search)
-        )
-    
     if category_id:
         products = products.filter(category_id=category_id)
     
-    products = products.order_by('name')
+    if search:
+        # Ranked by relevance, typo tolerant
+        products = ProductSearch.search(products, search)
+        ordering = ('-search_rank', 'name', 'id')
+    else:
+        ordering = ('name', 'id')
     
-    paginator = Paginator(products, settings.DEFAULT_PAGE_SIZE)
-    page = request.GET.get('page', 1)
-    products_page = paginator.get_page(page)
+    paginator = KeysetPaginator(
+        products, ordering, settings.DEFAULT_PAGE_SIZE, estimate_total=True
+    )
+    products_page = paginator.get_page(request.GET.get('cursor'))
     
     categories = Category.objects.all()
     
@@ -339,6 +554,7 @@ def product_list(request):
         'categories': categories,
         'search': search,
         'selected_category': category_id,
+        'query_string': _filter_query_string(request),
     }
     return render(request, 'inventory/product_list.html', context)
 
@@ -575,34 +791,51 @@ def movement_list(request):
     movement_type = request.GET.get('type', '')
     status = request.GET.get('status', '')
     
+    # Item totals and the "Name (qty)" tooltip are aggregated in SQL:
+    # no per-row or prefetch queries
     movements = Movement.objects.select_related(
         'performed_by', 'face_employee'
-    ).prefetch_related('items__product')
+    ).with_totals().with_summary()
     
     if movement_type:
         movements = movements.filter(movement_type=movement_type)
     if status:
         movements = movements.filter(status=status)
     
-    movements = movements.order_by('-created_at')
-    
-    paginator = Paginator(movements, settings.DEFAULT_PAGE_SIZE)
-    page = request.GET.get('page', 1)
-    movements_page = paginator.get_page(page)
+    paginator = KeysetPaginator(
+        movements, ('-created_at', '-id'), settings.DEFAULT_PAGE_SIZE, estimate_total=True
+    )
+    movements_page = paginator.get_page(request.GET.get('cursor'))
     
     context = {
         'movements': movements_page,
         'selected_type': movement_type,
         'selected_status': status,
+        'query_string': _filter_query_string(request),
     }
     return render(request, 'inventory/movement_list.html', context)
 
 
+def _movement_detail_etag(request, movement_id):
+    """One small query: the movement row, its items and reversal state."""
+    state = Movement.objects.filter(id=movement_id).annotate(
+        item_count=Count('items'),
+        item_quantity=Sum('items__quantity'),
+        last_item=Max('items__id'),
+        has_reversal=Exists(Movement.objects.filter(reversed_movement=OuterRef('pk'))),
+    ).values_list('updated_at', 'item_count', 'item_quantity', 'last_item', 'has_reversal').first()
+    if state is None:
+        return None
+    return page_etag(request, extra=state)
+
+
 @login_required
+@condition(etag_func=_movement_detail_etag)
 def movement_detail(request, movement_id):
     """Movement detail with items."""
     movement = get_object_or_404(
         Movement.objects.select_related('performed_by', 'face_employee')
+        .with_totals()
         .prefetch_related('items__product'),
         id=movement_id
     )
@@ -734,6 +967,9 @@ def employee_detail(request, employee_id):
 # Reports
 # ============================================
 
+RECENT_REPORT_JOBS = 10
+
+
 @login_required
 def report_dashboard(request):
     """Report dashboard with filters."""
@@ -746,160 +982,124 @@ def report_dashboard(request):
     context = {
         'start_date': start_date.isoformat(),
         'end_date': end_date.isoformat(),
+        'recent_jobs': ReportJob.objects.select_related('requested_by')[:RECENT_REPORT_JOBS],
+        'analytics_periods': ANALYTICS_PERIODS,
+        'analytics_days': DEFAULT_ANALYTICS_DAYS,
     }
     return render(request, 'inventory/report_dashboard.html', context)
 
 
-@login_required
-def download_stock_report(request):
-    """Download current stock report (Excel or PDF)."""
+def _report_download(request, report_type):
+    """
+    Render a report inside the request (small reports, CSV streams).
+    Unchanged reports are served from the report cache, with Range support.
+    """
     from django.http import HttpResponse
-    from .reports import ReportService
-    
+    from .reports import ReportError, ReportService
+
     format_type = request.GET.get('format', 'excel')
-    service = ReportService()
-    
-    data = service.get_stock_report_data()
-    
-    if format_type == 'pdf':
-        context = {
-            'stocks': data['stocks'],
-            'total_items': data['total_items'],
-            'total_qty': data['total_qty'],
-            'generated_at': timezone.now(),
-            'title': 'Ombor Qoldig\'i Hisoboti'
-        }
-        pdf_output = service.generate_pdf('inventory/reports/stock_pdf.html', context)
-        if pdf_output:
-            response = HttpResponse(pdf_output.read(), content_type='application/pdf')
-            response['Content-Disposition'] = 'attachment; filename="stock_report.pdf"'
-            return response
-        return HttpResponse("PDF yaratishda xatolik", status=500)
-    else:
-        # Excel
-        headers = ['SKU', 'Nomi', 'Kategoriya', 'O\'lchov', 'Hozirgi Soni', 'Min Soni', 'Holat']
-        excel_output = service.generate_excel(
-            data['excel_data'], headers, 
-            sheet_name="Ombor", title="Ombor Qoldig'i Hisoboti"
-        )
-        response = HttpResponse(
-            excel_output.read(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = 'attachment; filename="stock_report.xlsx"'
-        return response
+    if format_type not in dict(ReportJob.FORMATS):
+        format_type = 'excel'
+
+    try:
+        params = ReportService.normalize_params(report_type, request.GET)
+    except ReportError as e:
+        return HttpResponse(str(e), status=400)
+    try:
+        content, filename, content_type = ReportService.render_cached(report_type, format_type, params)
+    except ReportError as e:
+        return HttpResponse(str(e), status=500)
+
+    if hasattr(content, 'read'):
+        return ranged_file_response(request, content, filename, content_type)
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+def download_stock_report(request):
+    """Download current stock report (Excel, PDF or CSV)."""
+    return _report_download(request, 'stock')
 
 
 @login_required 
 def download_movement_report(request):
-    """Download movement report (Excel or PDF)."""
-    from django.http import HttpResponse
-    from datetime import datetime
-    from .reports import ReportService
-    
-    format_type = request.GET.get('format', 'excel')
-    movement_type = request.GET.get('type', 'ALL')
-    start_date_str = request.GET.get('start_date')
-    end_date_str = request.GET.get('end_date')
-    
-    # Parse dates
-    try:
-        start_date = datetime.strptime(start_date_str, '%Y-%m-%d') if start_date_str else datetime.now().replace(day=1)
-        end_date = datetime.strptime(end_date_str, '%Y-%m-%d') if end_date_str else datetime.now()
-        # Set end_date to end of day
-        end_date = end_date.replace(hour=23, minute=59, second=59)
-    except ValueError:
-        return HttpResponse("Noto'g'ri sana formati", status=400)
-    
-    service = ReportService()
-    data = service.get_movement_report_data(start_date, end_date, movement_type)
-    
-    type_label = {'IN': 'Kirim', 'OUT': 'Chiqim', 'ALL': 'Barcha'}.get(movement_type, 'Barcha')
-    title = f"{type_label} Hisoboti ({start_date.strftime('%d.%m.%Y')} - {end_date.strftime('%d.%m.%Y')})"
-    
-    if format_type == 'pdf':
-        context = {
-            'movements': data['movements'],
-            'start_date': data['start_date'],
-            'end_date': data['end_date'],
-            'generated_at': timezone.now(),
-            'title': title,
-            'type_label': type_label
-        }
-        pdf_output = service.generate_pdf('inventory/reports/movement_pdf.html', context)
-        if pdf_output:
-            response = HttpResponse(pdf_output.read(), content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="{movement_type.lower()}_report.pdf"'
-            return response
-        return HttpResponse("PDF yaratishda xatolik", status=500)
-    else:
-        # Excel
-        headers = ['ID', 'Turi', 'Sana', 'Foydalanuvchi', 'Xodim (Face ID)', 'Mahsulotlar', 'Izoh']
-        excel_output = service.generate_excel(
-            data['excel_data'], headers,
-            sheet_name="Harakatlar", title=title
-        )
-        response = HttpResponse(
-            excel_output.read(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{movement_type.lower()}_report.xlsx"'
-        return response
+    """Download movement report (Excel, PDF or CSV)."""
+    return _report_download(request, 'movement')
 
 
 @login_required
 def download_low_stock_report(request):
     """Download low stock warning report."""
-    from django.http import HttpResponse
-    from django.db import models
-    from .reports import ReportService
-    
-    format_type = request.GET.get('format', 'excel')
-    
-    # Get stocks where current_qty <= min_stock
-    low_stocks = Stock.objects.select_related('product', 'product__category').filter(
-        current_qty__lte=models.F('product__min_stock')
-    ).annotate(
-        deficit=models.F('product__min_stock') - models.F('current_qty')
-    ).order_by('current_qty')
-    
-    excel_data = []
-    for s in low_stocks:
-        excel_data.append([
-            s.product.sku,
-            s.product.name,
-            s.product.category.name,
-            s.current_qty,
-            s.product.min_stock,
-            s.product.min_stock - s.current_qty  # Deficit
-        ])
-    
-    service = ReportService()
-    
-    if format_type == 'pdf':
-        context = {
-            'stocks': low_stocks,
-            'generated_at': timezone.now(),
-            'title': 'Kamomat Hisoboti (Low Stock)'
-        }
-        pdf_output = service.generate_pdf('inventory/reports/low_stock_pdf.html', context)
-        if pdf_output:
-            response = HttpResponse(pdf_output.read(), content_type='application/pdf')
-            response['Content-Disposition'] = 'attachment; filename="low_stock_report.pdf"'
-            return response
-        return HttpResponse("PDF yaratishda xatolik", status=500)
-    else:
-        headers = ['SKU', 'Nomi', 'Kategoriya', 'Hozirgi Soni', 'Min Soni', 'Yetishmayotgan']
-        excel_output = service.generate_excel(
-            excel_data, headers,
-            sheet_name="Kamomat", title="Kamomat Hisoboti"
-        )
-        response = HttpResponse(
-            excel_output.read(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = 'attachment; filename="low_stock_report.xlsx"'
-        return response
+    return _report_download(request, 'low_stock')
+
+
+def _report_job_json(job):
+    data = {
+        'id': job.id,
+        'report_type': job.report_type,
+        'report_label': job.get_report_type_display(),
+        'format': job.format,
+        'params': job.params,
+        'status': job.status,
+        'status_label': job.get_status_display(),
+        'created_at': job.created_at.isoformat(),
+        'error': job.error,
+        'download_url': None,
+        'worker_available': True,
+    }
+    if job.status == 'DONE':
+        data['download_url'] = reverse('report_job_download', args=[job.id])
+    elif job.status == 'PENDING':
+        from .report_jobs import ReportJobService
+        data['worker_available'] = ReportJobService.worker_available()
+    return data
+
+
+@login_required
+@require_POST
+def report_job_create(request):
+    """
+    Queue a report for the background worker (run_report_worker).
+    An identical pending/running job is returned instead of a new one.
+    """
+    from .reports import ReportError, ReportService
+    from .report_jobs import ReportJobService
+
+    report_type = request.POST.get('report_type', '')
+    format_type = request.POST.get('format', '')
+    if format_type not in dict(ReportJob.FORMATS):
+        return JsonResponse({'success': False, 'error': "Noma'lum format"}, status=400)
+    try:
+        params = ReportService.normalize_params(report_type, request.POST)
+    except ReportError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    job = ReportJobService.enqueue(request.user, report_type, format_type, params)
+    return JsonResponse({'success': True, 'job': _report_job_json(job)}, status=202)
+
+
+@login_required
+@require_GET
+def report_job_status(request, job_id):
+    """Poll a report job."""
+    job = get_object_or_404(ReportJob, pk=job_id)
+    return JsonResponse({'success': True, 'job': _report_job_json(job)})
+
+
+@login_required
+@require_GET
+def report_job_download(request, job_id):
+    """Download a finished report job's artifact."""
+    from django.http import Http404
+    from .report_jobs import ReportJobService
+
+    job = get_object_or_404(ReportJob, pk=job_id, status='DONE')
+    path = ReportJobService.artifact_path(job)
+    if path is None:
+        raise Http404("Hisobot fayli topilmadi yoki muddati o'tgan")
+    return ranged_file_response(request, open(path, 'rb'), job.filename, job.content_type)
 
 
 # ============================================
@@ -907,6 +1107,7 @@ def download_low_stock_report(request):
 # ============================================
 
 @login_required
+@condition(etag_func=lambda request: page_etag(request, CATALOG))
 def qr_code_dashboard(request):
     """QR Code generation dashboard - list all products with QR codes."""
     from .qr_service import QRCodeService
@@ -945,7 +1146,28 @@ def qr_code_dashboard(request):
     return render(request, 'inventory/qr_dashboard.html', context)
 
 
+def _qr_code_state(request, product_id):
+    """Fields the QR image depends on; fetched once per request."""
+    if not hasattr(request, '_qr_code_state'):
+        request._qr_code_state = Product.objects.filter(id=product_id).values_list(
+            'barcode', 'uid', 'sku', 'updated_at'
+        ).first()
+    return request._qr_code_state
+
+
+def _qr_code_etag(request, product_id):
+    state = _qr_code_state(request, product_id)
+    return make_etag(*state[:3]) if state else None
+
+
+def _qr_code_last_modified(request, product_id):
+    state = _qr_code_state(request, product_id)
+    return state[3] if state else None
+
+
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_qr_code_etag, last_modified_func=_qr_code_last_modified)
 def qr_code_single(request, product_id):
     """Generate QR code image for a single product."""
     from .qr_service import QRCodeService
@@ -957,6 +1179,7 @@ def qr_code_single(request, product_id):
 
 
 @login_required
+@condition(etag_func=lambda request: page_etag(request, CATALOG))
 def qr_code_print(request):
     """Printable page with selected products' QR codes."""
     from .qr_service import QRCodeService
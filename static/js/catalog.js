@@ -0,0 +1,84 @@
+// Local product catalog for scanner stations
+// Synced from /product/catalog/ (full snapshot once, then deltas) and kept
+// in localStorage, so barcodes resolve without a server round trip.
+const ProductCatalog = (() => {
+    const STORAGE_KEY = 'ombor.catalog.v1';
+    const SYNC_INTERVAL_MS = 60000;
+
+    let state = { version: 0, etag: null, etagSince: null, fields: [], products: {} };
+    let byCode = new Map();
+
+    function normalize(code) {
+        return (code || '').trim().toUpperCase();
+    }
+
+    function load() {
+        try {
+            const saved = JSON.parse(localStorage.getItem(STORAGE_KEY));
+            if (saved && saved.products) state = saved;
+        } catch (err) {
+            localStorage.removeItem(STORAGE_KEY);
+        }
+        reindex();
+    }
+
+    function save() {
+        try {
+            localStorage.setItem(STORAGE_KEY, JSON.stringify(state));
+        } catch (err) {
+            // Quota exceeded: keep the catalog in memory only
+        }
+    }
+
+    function reindex() {
+        byCode = new Map();
+        const idx = Object.fromEntries(state.fields.map((name, i) => [name, i]));
+        for (const row of Object.values(state.products)) {
+            byCode.set(normalize(row[idx.sku]), row);
+            byCode.set(normalize(row[idx.barcode]), row);
+        }
+    }
+
+    async function sync(url) {
+        const since = state.version;
+        const headers = {};
+        // ETags are per `since`: only revalidate the same request
+        if (state.etag && state.etagSince === since) headers['If-None-Match'] = state.etag;
+
+        const resp = await fetch(`${url}?since=${since}`, { headers });
+        if (resp.status === 304 || !resp.ok) return;
+
+        const data = await resp.json();
+        const products = data.full ? {} : state.products;
+        for (const row of data.products) products[row[0]] = row;
+        for (const id of data.deleted) delete products[id];
+
+        state = {
+            version: data.version,
+            etag: resp.headers.get('ETag'),
+            etagSince: since,
+            fields: data.fields,
+            products: products
+        };
+        reindex();
+        save();
+    }
+
+    function lookup(code) {
+        const row = byCode.get(normalize(code));
+        if (!row) return null;
+        const product = Object.fromEntries(state.fields.map((name, i) => [name, row[i]]));
+        // Stock is live data: the server reports it when the item is added
+        product.stock_qty = null;
+        return product;
+    }
+
+    function start(url) {
+        load();
+        const run = () => sync(url).catch(() => { /* offline: keep the local copy */ });
+        run();
+        setInterval(run, SYNC_INTERVAL_MS);
+    }
+
+    return { start, sync, lookup };
+})();
@@ -0,0 +1,127 @@
+// Live updates for the dashboard and movement list
+// Server-sent events from /events/, with /events/poll/ as the fallback when
+// EventSource is unavailable or keeps failing (e.g. a buffering proxy).
+const LiveEvents = (() => {
+    const POLL_INTERVAL_MS = 10000;
+    const MAX_STREAM_ERRORS = 3;
+    const EVENT_TYPES = ['movement.verified', 'movement.reversed', 'stock.low', 'reset'];
+
+    function connect(urls, onEvent) {
+        if (!window.EventSource) {
+            poll(urls, onEvent, null);
+            return;
+        }
+
+        const source = new EventSource(urls.stream);
+        let errors = 0;
+        let cursor = null;
+
+        EVENT_TYPES.forEach(type => {
+            source.addEventListener(type, (e) => {
+                errors = 0;
+                cursor = e.lastEventId || cursor;
+                onEvent(type, type === 'reset' ? {} : JSON.parse(e.data).data);
+            });
+        });
+        source.addEventListener('open', () => { errors = 0; });
+        source.addEventListener('error', () => {
+            // EventSource reconnects by itself; give up only on repeated failures
+            if (++errors >= MAX_STREAM_ERRORS) {
+                source.close();
+                poll(urls, onEvent, cursor);
+            }
+        });
+    }
+
+    async function poll(urls, onEvent, cursor) {
+        try {
+            const query = cursor ? `?since=${encodeURIComponent(cursor)}` : '';
+            const resp = await fetch(urls.poll + query);
+            const data = await resp.json();
+            if (data.reset && cursor) {
+                onEvent('reset', {});
+            }
+            data.events.forEach(event => onEvent(event.type, event.data));
+            cursor = data.cursor;
+        } catch (err) {
+            // Offline: try again on the next tick
+        }
+        setTimeout(() => poll(urls, onEvent, cursor), POLL_INTERVAL_MS);
+    }
+
+    return { connect };
+})();
+
+function showLiveBanner(html, type = 'info') {
+    const banner = document.getElementById('live-banner');
+    if (!banner) return;
+    banner.innerHTML = html;
+    banner.className = `live-banner ${type}`;
+}
+
+function escapeText(value) {
+    const span = document.createElement('span');
+    span.textContent = value == null ? '' : String(value);
+    return span.innerHTML;
+}
+
+function lowStockMessage(data) {
+    return `⚠️ Kam zaxira: <b>${escapeText(data.name)}</b> (${escapeText(data.sku)}) — ` +
+        `${data.qty} ${escapeText(data.unit)}, minimal ${data.min_stock}`;
+}
+
+// Dashboard: counters come from the cached stats endpoint, debounced so a
+// burst of events costs one request
+function initLiveDashboard(urls) {
+    let statsTimer = null;
+
+    function refreshStats() {
+        clearTimeout(statsTimer);
+        statsTimer = setTimeout(async () => {
+            try {
+                const resp = await fetch(urls.stats);
+                const stats = await resp.json();
+                document.querySelectorAll('[data-stat]').forEach(el => {
+                    if (el.dataset.stat in stats) el.textContent = stats[el.dataset.stat];
+                });
+            } catch (err) {
+                // Counters stay as they are until the next event
+            }
+        }, 1000);
+    }
+
+    LiveEvents.connect(urls, (type, data) => {
+        if (type === 'reset') {
+            window.location.reload();
+        } else if (type === 'stock.low') {
+            showLiveBanner(lowStockMessage(data), 'warning');
+            refreshStats();
+        } else {
+            const verb = type === 'movement.reversed' ? 'bekor qilindi' : 'tasdiqlandi';
+            // A reversal names (and links) the reversed document, not the reversing one
+            const id = type === 'movement.reversed' ? data.original_id : data.id;
+            showLiveBanner(
+                `🔔 <a href="/movement/${id}/">#${id}</a> harakat ${verb} (${escapeText(data.user)}). ` +
+                `<a href="">Ro'yxatni yangilash</a>`
+            );
+            refreshStats();
+        }
+    });
+}
+
+// Movement list: count new documents and offer a reload instead of
+// re-rendering the page on every event
+function initLiveMovementList(urls) {
+    let newCount = 0;
+
+    LiveEvents.connect(urls, (type, data) => {
+        if (type === 'reset') {
+            showLiveBanner(`🔄 Ro'yxat eskirgan. <a href="">Yangilash</a>`);
+        } else if (type === 'stock.low') {
+            showLiveBanner(lowStockMessage(data), 'warning');
+        } else {
+            newCount++;
+            showLiveBanner(`🔔 ${newCount} ta yangi harakat. <a href="">Yangilash</a>`);
+        }
+    });
+}
@@ -32,10 +32,14 @@ const SOUNDS = {
 document.addEventListener('DOMContentLoaded', () => {
     initSettings();
     initQRInput();
+    initAutocomplete();
     initModal();
     initActions();
     renderItems();
     updateUI();
+    if (CONFIG.movementType === 'IN' && typeof ProductCatalog !== 'undefined') {
+        ProductCatalog.start(CONFIG.urls.catalog);
+    }
 });
 
 function initSettings() {
@@ -102,15 +106,231 @@ function initQRInput() {
 
         const barcode = qrInput.value.trim();
         qrInput.value = '';
+        clearTimeout(autocompleteTimer);
+        hideSuggestions();
 
         if (!barcode) return;
 
+        if (turboMode) {
+            // Scanner burst: collect codes read in quick succession
+            queueScan(barcode);
+            return;
+        }
+
         await lookupProduct(barcode);
         qrInput.focus();
     });
 }
 
+// Name/SKU autocomplete for typed input
+const AUTOCOMPLETE_DELAY_MS = 120;
+let suggestions = [];
+let activeSuggestion = -1;
+let autocompleteTimer = null;
+
+function initAutocomplete() {
+    const qrInput = document.getElementById('qr-input');
+    const list = document.getElementById('qr-suggestions');
+    if (!qrInput || !list || !CONFIG.urls.autocomplete) return;
+
+    qrInput.addEventListener('input', () => {
+        clearTimeout(autocompleteTimer);
+        const query = qrInput.value.trim();
+        if (turboMode || query.length < 2) {
+            hideSuggestions();
+            return;
+        }
+        autocompleteTimer = setTimeout(() => fetchSuggestions(query), AUTOCOMPLETE_DELAY_MS);
+    });
+
+    // keydown runs before the Enter handler in initQRInput
+    qrInput.addEventListener('keydown', async (e) => {
+        if (list.classList.contains('hidden')) return;
+
+        if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+            e.preventDefault();
+            const step = e.key === 'ArrowDown' ? 1 : -1;
+            activeSuggestion = (activeSuggestion + step + suggestions.length) % suggestions.length;
+            renderSuggestions();
+        } else if (e.key === 'Escape') {
+            hideSuggestions();
+        } else if (e.key === 'Enter' && activeSuggestion >= 0) {
+            e.preventDefault();
+            await chooseSuggestion(activeSuggestion);
+        }
+    });
+
+    list.addEventListener('mousedown', async (e) => {
+        const li = e.target.closest('li');
+        if (!li) return;
+        e.preventDefault();
+        await chooseSuggestion(parseInt(li.dataset.index));
+    });
+}
+
+async function fetchSuggestions(query) {
+    try {
+        const resp = await fetch(`${CONFIG.urls.autocomplete}?q=${encodeURIComponent(query)}`);
+        const data = await resp.json();
+        // Ignore answers for text that is no longer in the input
+        if (document.getElementById('qr-input').value.trim() !== query) return;
+        suggestions = data.results || [];
+        activeSuggestion = -1;
+        renderSuggestions();
+    } catch (err) {
+        hideSuggestions();
+    }
+}
+
+function renderSuggestions() {
+    const list = document.getElementById('qr-suggestions');
+    if (!suggestions.length) {
+        hideSuggestions();
+        return;
+    }
+    list.innerHTML = '';
+    suggestions.forEach((product, i) => {
+        const li = document.createElement('li');
+        li.dataset.index = i;
+        li.className = i === activeSuggestion ? 'active' : '';
+        const name = document.createElement('span');
+        name.textContent = product.name;
+        const sku = document.createElement('small');
+        sku.textContent = product.sku;
+        li.append(name, sku);
+        list.appendChild(li);
+    });
+    list.classList.remove('hidden');
+}
+
+function hideSuggestions() {
+    suggestions = [];
+    activeSuggestion = -1;
+    const list = document.getElementById('qr-suggestions');
+    if (list) list.classList.add('hidden');
+}
+
+async function chooseSuggestion(index) {
+    const product = suggestions[index];
+    const qrInput = document.getElementById('qr-input');
+    hideSuggestions();
+    if (!product) return;
+    qrInput.value = '';
+    await lookupProduct(product.barcode);
+    qrInput.focus();
+}
+
+// Burst mode: a pallet of labels is resolved with one request
+const BURST_WINDOW_MS = 150;
+let scanQueue = [];
+let scanTimer = null;
+let scanChain = Promise.resolve();
+
+function queueScan(barcode) {
+    scanQueue.push(barcode);
+    clearTimeout(scanTimer);
+    scanTimer = setTimeout(() => {
+        const codes = scanQueue;
+        scanQueue = [];
+        // Bursts are processed one after another, never in parallel
+        scanChain = scanChain.then(() => processBurst(codes));
+    }, BURST_WINDOW_MS);
+}
+
+async function processBurst(codes) {
+    if (codes.length === 1) {
+        await lookupProduct(codes[0]);
+    } else {
+        await lookupProducts(codes);
+    }
+    document.getElementById('qr-input').focus();
+}
+
+// Local catalog lookup, used for Turbo Mode IN movements only
+function localProduct(code) {
+    if (!turboMode || CONFIG.movementType !== 'IN' || typeof ProductCatalog === 'undefined') {
+        return null;
+    }
+    return ProductCatalog.lookup(code);
+}
+
+async function lookupProducts(codes) {
+    let added = 0;
+    const remote = [];
+    for (const code of codes) {
+        const local = localProduct(code);
+        if (local) {
+            selectedProduct = local;
+            await confirmAddItem(1);
+            added++;
+        } else {
+            remote.push(code);
+        }
+    }
+    if (!remote.length) {
+        SOUNDS.SUCCESS();
+        showToast('qr-success', `⚡ ${added} ta mahsulot qo'shildi`, 'success');
+        return;
+    }
+    codes = remote;
+
+    let data;
+    try {
+        const resp = await fetch(CONFIG.urls.productsByBarcodes, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': CONFIG.csrfToken
+            },
+            body: JSON.stringify({ codes: codes })
+        });
+        data = await resp.json();
+    } catch (err) {
+        SOUNDS.ERROR();
+        showToast('qr-error', 'Server xatosi', 'error');
+        return;
+    }
+
+    if (!data.ok) {
+        SOUNDS.ERROR();
+        showToast('qr-error', data.error || 'Xato', 'error');
+        return;
+    }
+
+    const notFound = [];
+    for (const code of codes) {
+        const result = data.results[code];
+        if (result && result.found) {
+            selectedProduct = result.product;
+            await confirmAddItem(1);
+            added++;
+        } else {
+            notFound.push(code);
+        }
+    }
+
+    if (notFound.length) {
+        SOUNDS.ERROR();
+        showToast('qr-error', `Topilmadi: ${notFound.join(', ')}`, 'error');
+    } else {
+        SOUNDS.SUCCESS();
+    }
+    if (added) {
+        showToast('qr-success', `⚡ ${added} ta mahsulot qo'shildi`, 'success');
+    }
+}
+
 async function lookupProduct(barcode) {
+    // Incoming stock needs no stock check: resolve on the station itself
+    const local = localProduct(barcode);
+    if (local) {
+        selectedProduct = local;
+        SOUNDS.SUCCESS();
+        await confirmAddItem(1);
+        showToast('qr-success', `⚡ Qo'shildi: ${local.name}`, 'success');
+        return;
+    }
+
     try {
         const resp = await fetch(`${CONFIG.urls.productByBarcode}?q=${encodeURIComponent(barcode)}`);
         const data = await resp.json();
@@ -298,7 +518,7 @@ function renderItems() {
             <td><code>${item.sku}</code></td>
             <td>${item.quantity}</td>
             <td>${item.unit}</td>
-            <td>${item.stockQty}</td>
+            <td>${item.stockQty ?? '—'}</td>
             <td>
                 <button type="button" class="btn btn-sm btn-danger remove-btn" data-id="${item.id}">
                     ✕